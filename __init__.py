@@ -13,13 +13,21 @@ from .image_process import (
     ImageGridCropper,
     BatchImageCrop,
     ImageAspectFixer,
-    AutoAspectRatioAdjustFixer
+    AutoAspectRatioAdjustFixer,
+    AspectRatioListCalculator,
+    AspectRatioCropResize
+)
+
+from .dataset_export import (
+    GridFolderExport
 )
 
 from .context import (
     ContextPipeIn,
     ContextPipeOut,
-    ContextPipeReroute
+    ContextPipeReroute,
+    KeyedContextSet,
+    KeyedContextGet
 )
 
 from .sting_process import (
@@ -38,8 +46,11 @@ from .data_file_loader import (
 
 from .json_process import (
     JsonFieldValueExtractor,
+    JsonMultiFieldExtractor,
     JsonFieldRemover,
-    JsonFieldReplaceAdvanced
+    JsonFieldReplaceAdvanced,
+    JsonPatchBatch,
+    JsonlBatchProcessor
 )
 
 from .batch_process import (
@@ -58,14 +69,19 @@ NODE_CLASS_MAPPINGS = {
     "ContextPipeIn": ContextPipeIn,
     "ContextPipeOut": ContextPipeOut,
     "ContextPipeReroute": ContextPipeReroute,
+    "KeyedContextSet": KeyedContextSet,
+    "KeyedContextGet": KeyedContextGet,
     "PromptPartJoin": PromptPartJoin,
     "PromptPartConcatenation": PromptPartConcatenation,
     "StringConcatenation": StringConcatenation,
     "DataFileLoader": DataFileLoader,
     "TextBlockProcessor": TextBlockProcessor,
     "JsonFieldValueExtractor": JsonFieldValueExtractor,
+    "JsonMultiFieldExtractor": JsonMultiFieldExtractor,
     "JsonFieldRemover": JsonFieldRemover,
     "JsonFieldReplaceAdvanced": JsonFieldReplaceAdvanced,
+    "JsonPatchBatch": JsonPatchBatch,
+    "JsonlBatchProcessor": JsonlBatchProcessor,
     "LoopAny": LoopAny,
     "ListItemExtractor": ListItemExtractor,
     "TextWrapper": TextWrapper,
@@ -74,6 +90,9 @@ NODE_CLASS_MAPPINGS = {
     "AnyCollector": AnyCollector,
     "ImageAspectFixer": ImageAspectFixer,
     "AutoAspectRatioAdjustFixer": AutoAspectRatioAdjustFixer,
+    "GridFolderExport": GridFolderExport,
+    "AspectRatioListCalculator": AspectRatioListCalculator,
+    "AspectRatioCropResize": AspectRatioCropResize,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
@@ -86,6 +105,8 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "ContextPipeIn": "Context Pipe In",
     "ContextPipeOut": "Context Pipe Out",
     "ContextPipeReroute": "Context Pipe Reroute",
+    "KeyedContextSet": "Keyed Context Set",
+    "KeyedContextGet": "Keyed Context Get",
     "PromptPartJoin": "Prompt Part Join",
     "PromptPartConcatenation": "Prompt Part Concatenation",
     "StringConcatenation": "String Concatenation",
@@ -93,8 +114,11 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "DataFileLoader": "Data File Loader",
     "TextBlockProcessor": "Text Block Processor",
     "JsonFieldValueExtractor": "JSON Field Value Extractor",
+    "JsonMultiFieldExtractor": "JSON Multi Field Extractor",
     "JsonFieldRemover": "JSON Field Remover",
     "JsonFieldReplaceAdvanced": "JSON Field Add & Replace",
+    "JsonPatchBatch": "JSON Batch Patch",
+    "JsonlBatchProcessor": "JSONL Batch Processor",
     "LoopAny": "Loop Any",
     "ListItemExtractor": "List Item Extractor",
     "TextWrapper": "Text Wrapper",
@@ -103,6 +127,9 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "AnyCollector": "Any Collector",
     "ImageAspectFixer": "Aspect Ratio Fixer (16:9 / 9:16)",
     "AutoAspectRatioAdjustFixer": "Aspect Ratio Fixer",
+    "GridFolderExport": "Grid Folder Export",
+    "AspectRatioListCalculator": "Aspect Ratio List Calculator",
+    "AspectRatioCropResize": "Aspect Ratio Crop & Resize",
 }
 
 __all__ = ['NODE_CLASS_MAPPINGS', 'NODE_DISPLAY_NAME_MAPPINGS', 'WEB_DIRECTORY']
@@ -1,6 +1,45 @@
+from collections.abc import Mapping
+from typing import Any, NamedTuple
+
+from .batch_process import Everything
+
+
+class ContextPipe(NamedTuple):
+    """
+    Immutable CONTEXT_PIPE value. A tuple, so old code indexing pipe[0..7]
+    keeps working; overriding slots returns a new pipe and never touches the
+    (cached) output of the upstream node.
+    """
+    model: Any = None
+    clip: Any = None
+    vae: Any = None
+    latent: Any = None
+    image: Any = None
+    positive: Any = None
+    negative: Any = None
+    path_pipe: Any = None
+
+    @classmethod
+    def coerce(cls, value):
+        """ContextPipe from a pipe, an old-style list/tuple (padded/truncated to 8) or None."""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, (list, tuple)):
+            return cls(*value[:len(cls._fields)])
+        return EMPTY_CONTEXT_PIPE
+
+    def override(self, **values):
+        """Copy with the given non-None slots replaced (self when nothing changes)."""
+        changes = {k: v for k, v in values.items() if v is not None and getattr(self, k) is not v}
+        return self._replace(**changes) if changes else self
+
+
+EMPTY_CONTEXT_PIPE = ContextPipe()
+
+
 class ContextPipeIn:
     """
-    Pipe node: collects or overrides context data into a context_pipe list.
+    Pipe node: collects or overrides context data into a ContextPipe.
     """
     @classmethod
     def INPUT_TYPES(cls):
@@ -35,19 +74,17 @@ class ContextPipeIn:
         negative=None,
         path_pipe=None,
     ):
-        base = context_pipe if isinstance(context_pipe, list) else [None] * 8
-
-        # Объединяем: приоритет у новых значений, затем из base, если новых нет
-        out = [
-            model if model is not None else base[0] if len(base) > 0 else None,
-            clip if clip is not None else base[1] if len(base) > 1 else None,
-            vae if vae is not None else base[2] if len(base) > 2 else None,
-            latent if latent is not None else base[3] if len(base) > 3 else None,
-            image if image is not None else base[4] if len(base) > 4 else None,
-            positive if positive is not None else base[5] if len(base) > 5 else None,
-            negative if negative is not None else base[6] if len(base) > 6 else None,
-            path_pipe if path_pipe is not None else base[7] if len(base) > 7 else None,
-        ]
+        # приоритет у новых значений, затем из входного pipe (старые list-pipe тоже принимаются)
+        out = ContextPipe.coerce(context_pipe).override(
+            model=model,
+            clip=clip,
+            vae=vae,
+            latent=latent,
+            image=image,
+            positive=positive,
+            negative=negative,
+            path_pipe=path_pipe,
+        )
 
         return (out,)
     
@@ -69,10 +106,8 @@ class ContextPipeOut:
     CATEGORY = "Stalkervr/Context"
 
     def execute(self, context_pipe):
-        # Fill with None if missing
-        ctx = context_pipe if isinstance(context_pipe, list) else [None] * 8
-        while len(ctx) < 8:
-            ctx.append(None)
+        # old list pipes are padded into a new ContextPipe, the input is never modified
+        ctx = ContextPipe.coerce(context_pipe)
         return (ctx, *ctx)
     
 class ContextPipeReroute:
@@ -95,3 +130,130 @@ class ContextPipeReroute:
 
     def execute(self, context_pipe):
         return (context_pipe,)
+
+
+class KeyedContext(Mapping):
+    """
+    Persistent (immutable) mapping for KEYED_CONTEXT pipes.
+
+    Every with_values() call adds one small layer holding only the changed keys
+    on top of the previous context, which is shared, not copied. Lookups walk
+    the layers; once a chain gets deeper than MAX_DEPTH it is flattened into a
+    single layer, so long pipe chains cost O(changed keys) per hop plus an
+    occasional O(n) compaction.
+    """
+    __slots__ = ("_changes", "_parent", "_depth", "_flat")
+
+    MAX_DEPTH = 16
+
+    def __init__(self, values=None, _parent=None):
+        self._changes = dict(values or {})
+        self._parent = _parent
+        self._depth = _parent._depth + 1 if _parent is not None else 0
+        self._flat = None if _parent is not None else self._changes
+
+    def with_values(self, values):
+        """New context with the non-None `values` set (self when nothing changes)."""
+        changes = {
+            k: v for k, v in values.items()
+            if v is not None and self.get(k, _MISSING_KEY) is not v
+        }
+        if not changes:
+            return self
+        if self._depth >= self.MAX_DEPTH:
+            flat = dict(self._items())
+            flat.update(changes)
+            return KeyedContext(flat)
+        return KeyedContext(changes, _parent=self)
+
+    def __getitem__(self, key):
+        node = self
+        while node is not None:
+            if node._flat is not None:
+                return node._flat[key]
+            value = node._changes.get(key, _MISSING_KEY)
+            if value is not _MISSING_KEY:
+                return value
+            node = node._parent
+        raise KeyError(key)
+
+    def _items(self):
+        """Flattened {key: value}, computed once per context (it never changes)."""
+        if self._flat is None:
+            flat = dict(self._parent._items())
+            flat.update(self._changes)
+            self._flat = flat
+        return self._flat
+
+    def __iter__(self):
+        return iter(self._items())
+
+    def __len__(self):
+        return len(self._items())
+
+    def __repr__(self):
+        return f"KeyedContext({sorted(self._items())})"
+
+
+_MISSING_KEY = object()
+EMPTY_KEYED_CONTEXT = KeyedContext()
+
+KEYED_CONTEXT_SLOTS = 4
+
+
+class KeyedContextSet:
+    """
+    Pipe node: sets named entries (mask, seed, controlnet, ...) in a keyed context.
+    Only the given keys are stored in the new context; everything else is shared
+    with the input. Empty keys and unconnected values are ignored.
+    """
+    @classmethod
+    def INPUT_TYPES(cls):
+        optional = {"keyed_context": ("KEYED_CONTEXT",)}
+        for i in range(1, KEYED_CONTEXT_SLOTS + 1):
+            optional[f"key_{i}"] = ("STRING", {"default": ""})
+            optional[f"value_{i}"] = (Everything("*"),)
+        return {"optional": optional}
+
+    RETURN_TYPES = ("KEYED_CONTEXT",)
+    RETURN_NAMES = ("keyed_context",)
+    FUNCTION = "execute"
+    CATEGORY = "Stalkervr/Context"
+
+    def execute(self, keyed_context=None, **slots):
+        base = keyed_context if isinstance(keyed_context, KeyedContext) else EMPTY_KEYED_CONTEXT
+        values = {}
+        for i in range(1, KEYED_CONTEXT_SLOTS + 1):
+            key = (slots.get(f"key_{i}") or "").strip()
+            if key:
+                values[key] = slots.get(f"value_{i}")
+        return (base.with_values(values),)
+
+
+class KeyedContextGet:
+    """
+    Pipe node: reads named entries from a keyed context (None for missing keys).
+    """
+    @classmethod
+    def INPUT_TYPES(cls):
+        optional = {f"key_{i}": ("STRING", {"default": ""}) for i in range(1, KEYED_CONTEXT_SLOTS + 1)}
+        return {
+            "required": {"keyed_context": ("KEYED_CONTEXT",)},
+            "optional": optional,
+        }
+
+    RETURN_TYPES = ("KEYED_CONTEXT",) + (Everything("*"),) * KEYED_CONTEXT_SLOTS
+    RETURN_NAMES = ("keyed_context",) + tuple(f"value_{i}" for i in range(1, KEYED_CONTEXT_SLOTS + 1))
+    FUNCTION = "execute"
+    CATEGORY = "Stalkervr/Context"
+
+    def execute(self, keyed_context, **keys):
+        ctx = keyed_context if isinstance(keyed_context, KeyedContext) else EMPTY_KEYED_CONTEXT
+        values = []
+        for i in range(1, KEYED_CONTEXT_SLOTS + 1):
+            key = (keys.get(f"key_{i}") or "").strip()
+            value = ctx.get(key) if key else None
+            if key and value is None:
+                print(f"[KeyedContextGet] Key '{key}' not found")
+            values.append(value)
+        return (keyed_context, *values)
@@ -0,0 +1,495 @@
+import ctypes
+import ctypes.util
+import mmap
+import os
+import select
+import threading
+import zlib
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+from .json_backend import dumps_bytes, load, loads
+
+
+class NameIndex:
+    """
+    Case-insensitive search index over the names of one source.
+    Sorted keys give prefix ranges via bisect; a trigram index (built on first use)
+    narrows substring queries down before the final check.
+    """
+
+    def __init__(self, names):
+        # names come from user JSON, so non-string entries (numbers) are indexed by their text
+        self.names = sorted(set(names), key=lambda n: (str(n).casefold(), str(n)))
+        self.keys = [str(n).casefold() for n in self.names]
+        self._trigrams = None
+        self._trigram_lock = threading.Lock()
+
+    def prefix_range(self, prefix):
+        p = prefix.casefold()
+        if not p:
+            return 0, len(self.keys)
+        lo = bisect_left(self.keys, p)
+        hi = bisect_left(self.keys, p[:-1] + chr(ord(p[-1]) + 1), lo)
+        return lo, hi
+
+    def _trigram_index(self):
+        trigrams = self._trigrams
+        if trigrams is not None:
+            return trigrams
+        # concurrent searches on a fresh index build it once; the others wait for it
+        with self._trigram_lock:
+            if self._trigrams is None:
+                trigrams = {}
+                for i, key in enumerate(self.keys):
+                    for gram in {key[j:j + 3] for j in range(len(key) - 2)}:
+                        postings = trigrams.get(gram)
+                        if postings is None:
+                            postings = trigrams[gram] = array("I")
+                        postings.append(i)
+                self._trigrams = trigrams
+            return self._trigrams
+
+    def _substring_candidates(self, q, lo, hi):
+        if len(q) < 3:
+            return range(lo, hi)
+
+        trigrams = self._trigram_index()
+        postings = []
+        for gram in {q[j:j + 3] for j in range(len(q) - 2)}:
+            p = trigrams.get(gram)
+            if p is None:
+                return []
+            postings.append(p)
+        postings.sort(key=len)
+
+        candidates = set(postings[0])
+        for p in postings[1:]:
+            candidates.intersection_update(p)
+            if not candidates:
+                return []
+        return sorted(i for i in candidates if lo <= i < hi)
+
+    def search(self, prefix="", query="", offset=0, limit=50):
+        """Returns (total, names[offset:offset + limit]) in sorted order."""
+        lo, hi = self.prefix_range(prefix or "")
+        q = (query or "").casefold()
+
+        if not q:
+            return hi - lo, self.names[lo + offset:min(hi, lo + offset + limit)]
+
+        keys = self.keys
+        matches = [i for i in self._substring_candidates(q, lo, hi) if q in keys[i]]
+        return len(matches), [self.names[i] for i in matches[offset:offset + limit]]
+
+
+class SourceEntry:
+    """
+    Parsed contents of one data source file.
+    Keeps the original name order and a name -> description dict for O(1) lookups.
+    """
+    __slots__ = ("source", "path", "mtime_ns", "size", "names", "descriptions", "_names_json", "_index")
+
+    def __init__(self, source, path, mtime_ns, size, names, descriptions):
+        self.source = source
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.names = names
+        self.descriptions = descriptions
+        self._names_json = None
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = NameIndex(self.names)
+        return self._index
+
+    @property
+    def etag(self):
+        # the same URL serves every source → mix the source name into the tag
+        return f'"{zlib.crc32(self.source.encode("utf-8")):x}-{self.mtime_ns:x}-{self.size:x}"'
+
+    def names_json(self):
+        """{"names": [...]} payload, serialized once per file version."""
+        if self._names_json is None:
+            self._names_json = dumps_bytes({"names": list(self.names)})
+        return self._names_json
+
+    def is_fresh(self, st):
+        return self.mtime_ns == st.st_mtime_ns and self.size == st.st_size
+
+    def get(self, name):
+        return self.descriptions.get(name)
+
+
+class JsonlSourceEntry(SourceEntry):
+    """
+    Line-delimited source (data/<source>.jsonl, one {"name", "description"} object per line).
+    Only names and byte offsets are kept in memory; descriptions are read back on demand
+    by seeking to the line and decoding just that record.
+    """
+    __slots__ = ()
+
+    def get(self, name):
+        span = self.descriptions.get(name)
+        if span is None:
+            return None
+        start, end = span
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            item = loads(f.read(end - start))
+        return item.get("description", "")
+
+
+class DataCatalog:
+    """
+    Process-wide cache of the data/<source>.json and data/<source>.jsonl files.
+
+    Every source is parsed once and re-read only when its mtime or size changes,
+    so repeated INPUT_TYPES calls and lookups cost a single os.stat per source.
+    While a DataDirWatcher is running, the watcher is the source of truth and
+    lookups do no disk I/O at all.
+    """
+
+    # .json wins if both files exist for the same source
+    EXTENSIONS = (".json", ".jsonl")
+
+    def __init__(self, data_dir):
+        self.data_dir = Path(data_dir)
+        self._entries = {}
+        self._all_names_key = None
+        self._all_names = []
+        self._watched_sources = None
+        self._lock = threading.RLock()
+
+    # --- sources ---
+
+    def sources(self):
+        watched = self._watched_sources
+        if watched is not None:
+            return sorted(watched)
+        return self.scan_sources()
+
+    def scan_sources(self):
+        found = set()
+        try:
+            with os.scandir(self.data_dir) as it:
+                for f in it:
+                    stem, ext = os.path.splitext(f.name)
+                    if ext in self.EXTENSIONS and f.is_file():
+                        found.add(stem)
+        except OSError as e:
+            print(f"[DataCatalog] Cannot read data directory '{self.data_dir}': {e}")
+        return sorted(found)
+
+    def path_for(self, source):
+        # source comes from the UI / HTTP requests → never allow leaving data_dir
+        if not source or os.path.basename(source) != source or source.startswith("."):
+            return None
+        for ext in self.EXTENSIONS:
+            path = self.data_dir / f"{source}{ext}"
+            if path.is_file():
+                return path
+        return None
+
+    # --- entries ---
+
+    def entry(self, source):
+        """Returns an up-to-date SourceEntry or None if the source does not exist."""
+        watched = self._watched_sources
+        if watched is not None:
+            if source not in watched:
+                return None
+            cached = self._entries.get(source)
+            if cached is not None:
+                return cached
+
+        path = self.path_for(source)
+        if path is None:
+            self._drop(source)
+            return None
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._drop(source)
+            return None
+
+        cached = self._entries.get(source)
+        if cached is not None and cached.path == path and cached.is_fresh(st):
+            return cached
+
+        with self._lock:
+            # another thread may have reloaded it while we were waiting
+            cached = self._entries.get(source)
+            if cached is not None and cached.path == path and cached.is_fresh(st):
+                return cached
+            entry = self._load(source, path, st)
+            self._entries[source] = entry
+            return entry
+
+    def apply_changes(self, sources, changed):
+        """
+        Called by DataDirWatcher: installs the current source list and reloads
+        the changed sources that were already loaded (others stay lazy).
+        """
+        with self._lock:
+            reload = [s for s in changed if s in self._entries and s in sources]
+            for source in changed:
+                self._entries.pop(source, None)
+            self._watched_sources = frozenset(sources)
+        for source in reload:
+            self.entry(source)
+
+    def stop_watching(self):
+        self._watched_sources = None
+
+    def _drop(self, source):
+        if source in self._entries:
+            with self._lock:
+                self._entries.pop(source, None)
+
+    def _load(self, source, path, st):
+        if path.suffix == ".jsonl":
+            return self._load_jsonl(source, path, st)
+
+        names = []
+        descriptions = {}
+        try:
+            content = load(path)
+            for item in content:
+                if not isinstance(item, dict) or "name" not in item:
+                    continue
+                name = item["name"]
+                names.append(name)
+                # first occurrence wins, like the old linear scan
+                descriptions.setdefault(name, item.get("description", ""))
+        except Exception as e:
+            print(f"[DataCatalog] Error reading '{path}': {e}")
+
+        print(f"[DataCatalog] Loaded '{source}': {len(names)} names")
+        return SourceEntry(source, path, st.st_mtime_ns, st.st_size, tuple(names), descriptions)
+
+    def _load_jsonl(self, source, path, st):
+        names = []
+        offsets = {}
+        try:
+            with open(path, "rb") as f:
+                if st.st_size > 0:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        size = len(mm)
+                        pos = 0
+                        while pos < size:
+                            end = mm.find(b"\n", pos)
+                            if end == -1:
+                                end = size
+                            line = mm[pos:end]
+                            if line.strip():
+                                try:
+                                    item = loads(line)
+                                except ValueError as e:
+                                    print(f"[DataCatalog] Skipping bad line at byte {pos} in '{path}': {e}")
+                                    item = None
+                                if isinstance(item, dict) and "name" in item:
+                                    name = item["name"]
+                                    names.append(name)
+                                    offsets.setdefault(name, (pos, end))
+                            pos = end + 1
+        except Exception as e:
+            print(f"[DataCatalog] Error indexing '{path}': {e}")
+
+        print(f"[DataCatalog] Indexed '{source}' (jsonl): {len(names)} names")
+        return JsonlSourceEntry(source, path, st.st_mtime_ns, st.st_size, tuple(names), offsets)
+
+    # --- lookups ---
+
+    def names(self, source):
+        entry = self.entry(source)
+        return entry.names if entry is not None else ()
+
+    def get(self, source, name):
+        entry = self.entry(source)
+        return entry.get(name) if entry is not None else None
+
+    def names_payload(self, source):
+        """(etag, {"names": [...]} bytes) or None if the source does not exist."""
+        entry = self.entry(source)
+        if entry is None:
+            return None
+        return entry.etag, entry.names_json()
+
+    def search(self, source, prefix="", query="", offset=0, limit=50):
+        entry = self.entry(source)
+        if entry is None:
+            return 0, []
+        return entry.index.search(prefix, query, offset, limit)
+
+    def all_names(self, sources=None):
+        """Sorted union of the names of all sources, rebuilt only when a source changed."""
+        if sources is None:
+            sources = self.sources()
+
+        entries = [e for e in (self.entry(s) for s in sources) if e is not None]
+        key = tuple((e.source, e.mtime_ns, e.size) for e in entries)
+        if key != self._all_names_key:
+            names = set()
+            for e in entries:
+                names.update(e.names)
+            with self._lock:
+                self._all_names = sorted(names)
+                self._all_names_key = key
+        return self._all_names
+
+
+class _Inotify:
+    """Minimal inotify binding (Linux only) used to wake the watcher on directory changes."""
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = 0o2000000
+
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(str(path)), self.MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for '{path}'")
+
+    def wait(self, timeout):
+        """Blocks until an event arrives or timeout expires. Returns True on events."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DataDirWatcher:
+    """
+    Background thread that keeps DataCatalog in sync with the data directory.
+
+    Wakes up on inotify events where available, otherwise polls the directory with
+    os.scandir every `interval` seconds. Stat snapshots are diffed, so on_change(sources,
+    changed) is only called when a source file was really added, removed or modified.
+    """
+
+    DEBOUNCE = 0.2
+
+    def __init__(self, catalog, on_change=None, interval=2.0, extra_files=()):
+        self.catalog = catalog
+        self.on_change = on_change
+        self.interval = interval
+        # files that are not sources but should still trigger a refresh (e.g. catalog.sqlite)
+        self.extra_files = frozenset(extra_files)
+        self._stop = threading.Event()
+        self._thread = None
+        self._snapshot = {}
+
+    def start(self):
+        if self._thread is not None:
+            return
+        # watch first, then snapshot → nothing slips in between
+        inotify = None
+        try:
+            inotify = _Inotify(self.catalog.data_dir)
+            print("[DataDirWatcher] Watching data directory with inotify")
+        except (OSError, AttributeError) as e:
+            print(f"[DataDirWatcher] inotify unavailable ({e}), polling every {self.interval}s")
+
+        self._stop.clear()
+        self._snapshot = self._scan()
+        self.catalog.apply_changes(self._sources(self._snapshot), ())
+        self._thread = threading.Thread(target=self._run, args=(inotify,), name="DataDirWatcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.catalog.stop_watching()
+
+    def _scan(self):
+        snapshot = {}
+        try:
+            with os.scandir(self.catalog.data_dir) as it:
+                for f in it:
+                    ext = os.path.splitext(f.name)[1]
+                    if ext not in self.catalog.EXTENSIONS and f.name not in self.extra_files:
+                        continue
+                    try:
+                        st = f.stat()
+                    except OSError:
+                        continue
+                    snapshot[f.name] = (st.st_mtime_ns, st.st_size)
+        except OSError as e:
+            print(f"[DataDirWatcher] Cannot scan '{self.catalog.data_dir}': {e}")
+        return snapshot
+
+    def _sources(self, snapshot):
+        return sorted({
+            os.path.splitext(name)[0]
+            for name in snapshot
+            if os.path.splitext(name)[1] in self.catalog.EXTENSIONS
+        })
+
+    def _diff(self, old, new):
+        changed_files = {n for n in old.keys() | new.keys() if old.get(n) != new.get(n)}
+        sources = self._sources(new)
+        if changed_files & self.extra_files:
+            # e.g. the SQLite catalog was re-imported → any source may have changed
+            return sources, set(sources) | set(self._sources(old))
+        return sources, {os.path.splitext(n)[0] for n in changed_files}
+
+    def _run(self, inotify):
+        try:
+            while not self._stop.is_set():
+                if inotify is not None:
+                    if not inotify.wait(self.interval):
+                        continue
+                    # editors save in several steps → let the burst settle
+                    if self._stop.wait(self.DEBOUNCE):
+                        break
+                elif self._stop.wait(self.interval):
+                    break
+
+                snapshot = self._scan()
+                if snapshot == self._snapshot:
+                    continue
+                sources, changed = self._diff(self._snapshot, snapshot)
+                self._snapshot = snapshot
+
+                self.catalog.apply_changes(sources, changed)
+                print(f"[DataDirWatcher] Changed sources: {sorted(changed)}")
+                if self.on_change is not None:
+                    try:
+                        self.on_change(sources, sorted(changed))
+                    except Exception as e:
+                        print(f"[DataDirWatcher] on_change failed: {e}")
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+
+CATALOG = DataCatalog(Path(__file__).parent / "data")
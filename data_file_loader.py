@@ -1,24 +1,45 @@
-import json
+import asyncio
 from pathlib import Path
 from aiohttp import web
 
+from .data_catalog import CATALOG, DataDirWatcher
+from .data_store import DB_FILENAME, SQLITE_STORE
+from .json_backend import dumps as json_dumps
+
+DATA_DIR = Path(__file__).parent / "data"
+
+def _store_for(source):
+    """
+    data/catalog.sqlite for imported sources whose file did not change since the import,
+    the parsed-file catalog otherwise.
+    """
+    if SQLITE_STORE.available() and SQLITE_STORE.has_source(source, CATALOG.path_for(source)):
+        return SQLITE_STORE
+    return CATALOG
+
+def _all_sources():
+    sources = CATALOG.sources()
+    if SQLITE_STORE.available():
+        sources = sorted(set(sources).union(SQLITE_STORE.sources()))
+    return sources
+
 class DataFileLoader:
     @classmethod
     def INPUT_TYPES(cls):
         sources = cls._get_sources()
 
-        # Соберём список всех имен из всех source-файлов
-        all_names = set()
-        for source in sources:
-            all_names.update(cls._get_names_for_source(source))
+        # Соберём список всех имен из всех source-файлов (из кэша каталога / SQLite)
+        db_sources = [s for s in sources if _store_for(s) is SQLITE_STORE]
+        all_names = CATALOG.all_names([s for s in sources if s not in db_sources])
+        if db_sources:
+            all_names = sorted(set(all_names).union(SQLITE_STORE.all_names(db_sources)))
 
-        all_names = sorted(all_names)
         print(f"[DataFileLoader] INPUT_TYPES -> sources: {sources}")
-        print(f"[DataFileLoader] INPUT_TYPES -> all names: {all_names}")
+        print(f"[DataFileLoader] INPUT_TYPES -> all names: {len(all_names)}")
 
         return {
             "required": {
-                "source": (sources, {"default": sources[0]}),
+                "source": (sources, {"default": sources[0] if sources else ""}),
                 "name": (all_names, {"default": all_names[0] if all_names else ""})
             }
         }
@@ -29,71 +50,144 @@ class DataFileLoader:
 
     def get_description(self, source, name):
         print(f"[DataFileLoader] get_description called with source='{source}', name='{name}'")
-        file_path = Path(__file__).parent / "data" / f"{source}.json"
         try:
-            with open(file_path, encoding="utf-8") as f:
-                content = json.load(f)
-                for item in content:
-                    if item.get("name") == name:
-                        description = item.get("description", "")
-                        print(f"[DataFileLoader] Description found: {description}")
-                        return (description,)
+            description = _store_for(source).get(source, name)
+            if description is not None:
+                print(f"[DataFileLoader] Description found: {description}")
+                return (description,)
         except Exception as e:
             print(f"[DataFileLoader] Ошибка при поиске description: {e}")
         return ("",)
 
     @staticmethod
     def _get_sources():
-        data_dir = Path(__file__).parent / "data"
-        sources = [f.stem for f in data_dir.glob("*.json")]
+        sources = _all_sources()
         print(f"[DataFileLoader] _get_sources -> {sources}")
         return sources
 
     @staticmethod
     def _get_names_for_source(source):
-        file_path = Path(__file__).parent / "data" / f"{source}.json"
-        if not file_path.exists():
-            print(f"[DataFileLoader] _get_names_for_source -> файл не найден: {file_path}")
-            return []
-        try:
-            with open(file_path, encoding="utf-8") as f:
-                content = json.load(f)
-                names = [item["name"] for item in content if "name" in item]
-                return names
-        except Exception as e:
-            print(f"[DataFileLoader] Ошибка чтения файла '{file_path}': {e}")
-            return []
+        store = _store_for(source)
+        names = store.names(source)
+        if store is CATALOG and CATALOG.path_for(source) is None:
+            print(f"[DataFileLoader] _get_names_for_source -> файл не найден: {source}")
+        return list(names)
 
 # === HTTP API ===
 
-DATA_DIR = Path(__file__).parent / "data"
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return any(t == etag or t == f"W/{etag}" for t in tags)
+
+def _names_payload(source):
+    # сериализация большого списка тоже не должна идти в event loop
+    return _store_for(source).names_payload(source)
 
 async def handle_names_for_source(request):
-    data = await request.post()
-    source = data.get("source")
+    if request.method == "POST":
+        data = await request.post()
+        source = data.get("source")
+    else:
+        source = request.rel_url.query.get("source")
     print(f"[DataFileLoader] Запрошен список имён для source: '{source}'")
 
-    file_path = DATA_DIR / f"{source}.json"
-    if not file_path.exists():
-        print(f"[DataFileLoader] Файл не найден: {file_path}")
-        return web.json_response({"names": []})
+    try:
+        # чтение и парсинг файла — в пуле потоков, чтобы не блокировать PromptServer
+        loop = asyncio.get_running_loop()
+        payload = await loop.run_in_executor(None, _names_payload, source)
+    except Exception as e:
+        print(f"[DataFileLoader] Ошибка при чтении source '{source}': {e}")
+        return web.json_response({"names": []}, dumps=json_dumps)
+
+    if payload is None:
+        print(f"[DataFileLoader] Файл не найден для source: '{source}'")
+        return web.json_response({"names": []}, dumps=json_dumps)
+
+    etag, body = payload
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("If-None-Match"), etag):
+        return web.Response(status=304, headers=headers)
+
+    return web.Response(body=body, content_type="application/json", charset="utf-8", headers=headers)
+
+SEARCH_DEFAULT_LIMIT = 50
+SEARCH_MAX_LIMIT = 1000
+
+def _int_param(params, key, default, minimum, maximum):
+    try:
+        value = int(params.get(key, default))
+    except (TypeError, ValueError):
+        value = default
+    return max(minimum, min(value, maximum))
+
+def _search(source, field, prefix, query, offset, limit):
+    store = _store_for(source)
+    if field == "description":
+        if store is not SQLITE_STORE:
+            raise ValueError("description search requires data/catalog.sqlite")
+        return store.search_descriptions(source, query, offset, limit)
+    return store.search(source, prefix, query, offset, limit)
+
+async def handle_search_names(request):
+    if request.method == "POST":
+        params = await request.post()
+    else:
+        params = request.rel_url.query
+
+    source = params.get("source")
+    prefix = params.get("prefix", "")
+    query = params.get("query", "")
+    # field=description → полнотекстовый поиск по описаниям (только для SQLite-каталога)
+    field = params.get("field", "name")
+    offset = _int_param(params, "offset", 0, 0, 2 ** 31)
+    limit = _int_param(params, "limit", SEARCH_DEFAULT_LIMIT, 1, SEARCH_MAX_LIMIT)
 
     try:
-        with open(file_path, encoding="utf-8") as f:
-            content = json.load(f)
-            names = [item["name"] for item in content if "name" in item]
-            print(f"[DataFileLoader] Найдено имён: {len(names)} -> {names}")
-            return web.json_response({"names": names})
+        loop = asyncio.get_running_loop()
+        total, names = await loop.run_in_executor(
+            None, _search, source, field, prefix, query, offset, limit
+        )
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400, dumps=json_dumps)
     except Exception as e:
-        print(f"[DataFileLoader] Ошибка при чтении файла '{file_path}': {e}")
-        return web.json_response({"names": []})
+        print(f"[DataFileLoader] Ошибка поиска в source '{source}': {e}")
+        total, names = 0, []
+
+    return web.json_response({
+        "names": names,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+    }, dumps=json_dumps)
 
 def setup_routes(app):
     app.router.add_post("/datafile/names_for_source", handle_names_for_source)
+    app.router.add_get("/datafile/names_for_source", handle_names_for_source)
+    app.router.add_post("/datafile/search_names", handle_search_names)
+    app.router.add_get("/datafile/search_names", handle_search_names)
+
+# === Watcher ===
+
+SOURCES_CHANGED_EVENT = "datafile.sources_changed"
+
+def _notify_sources_changed(sources, changed):
+    # send_sync потокобезопасен — вызывается из потока наблюдателя
+    import server
+    server.PromptServer.instance.send_sync(SOURCES_CHANGED_EVENT, {
+        "sources": _all_sources(),
+        "changed": changed,
+    })
+
+WATCHER = DataDirWatcher(CATALOG, on_change=_notify_sources_changed, extra_files=(DB_FILENAME,))
 
 try:
     import server
     setup_routes(server.PromptServer.instance.app)
-    print("[DataFileLoader] Эндпоинт /datafile/names_for_source зарегистрирован")
+    print("[DataFileLoader] Эндпоинты /datafile/names_for_source и /datafile/search_names зарегистрированы")
+    WATCHER.start()
 except Exception as e:
     print(f"[DataFileLoader] Ошибка регистрации эндпоинта: {e}")
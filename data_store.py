@@ -0,0 +1,397 @@
+"""
+Optional SQLite backend for DataFileLoader.
+
+When data/catalog.sqlite exists, imported sources are served from it through
+read-only per-thread connections instead of parsing the JSON files.
+
+Bulk import (single transaction, replaces the imported sources):
+    python data_store.py import [--data-dir DIR] [--db FILE] [source ...]
+"""
+import argparse
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+if __package__:
+    from .json_backend import dumps_bytes, load, loads
+else:
+    # executed as a script (python data_store.py import ...)
+    from json_backend import dumps_bytes, load, loads
+
+DATA_DIR = Path(__file__).parent / "data"
+DB_FILENAME = "catalog.sqlite"
+SOURCE_EXTENSIONS = (".json", ".jsonl")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    source TEXT PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    file_mtime_ns INTEGER NOT NULL,
+    file_size INTEGER NOT NULL,
+    entry_count INTEGER NOT NULL,
+    imported_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS entries_source_name ON entries(source, name);
+CREATE INDEX IF NOT EXISTS entries_source_key ON entries(source, name_key);
+CREATE INDEX IF NOT EXISTS entries_source_position ON entries(source, position);
+"""
+
+# separate from SCHEMA: SQLite builds without FTS5 still get a working catalog,
+# description search then falls back to LIKE
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    name, description, content='entries', content_rowid='id'
+);
+"""
+
+
+def _entry(item, path):
+    """
+    (name, description) row values for one item, or None when the item has no usable name.
+    The columns are TEXT NOT NULL, so a null description becomes "" and
+    objects / arrays are stored as their JSON text.
+    """
+    if not isinstance(item, dict):
+        return None
+    name = item.get("name")
+    if name is None or isinstance(name, (dict, list)):
+        if "name" in item:
+            print(f"[DataStore] Skipping entry with unusable name {name!r} in '{path}'")
+        return None
+    description = item.get("description")
+    if description is None:
+        description = ""
+    elif not isinstance(description, str):
+        description = dumps_bytes(description).decode("utf-8")
+    return str(name), description
+
+
+def _iter_items(path):
+    """Yields (name, description) from a .json array or a .jsonl file."""
+    path = Path(path)
+    if path.suffix == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    item = loads(line)
+                except ValueError as e:
+                    print(f"[DataStore] Skipping bad line in '{path}': {e}")
+                    continue
+                entry = _entry(item, path)
+                if entry is not None:
+                    yield entry
+    else:
+        content = load(path)
+        for item in content:
+            entry = _entry(item, path)
+            if entry is not None:
+                yield entry
+
+
+def _source_files(data_dir, sources=None):
+    files = {}
+    for ext in reversed(SOURCE_EXTENSIONS):
+        # .json overrides .jsonl for the same stem, like DataCatalog
+        for path in Path(data_dir).glob(f"*{ext}"):
+            files[path.stem] = path
+    if sources:
+        missing = [s for s in sources if s not in files]
+        if missing:
+            raise FileNotFoundError(f"Sources not found in '{data_dir}': {missing}")
+        return {s: files[s] for s in sources}
+    return files
+
+
+def import_sources(data_dir=DATA_DIR, db_path=None, sources=None):
+    """
+    Bulk-loads data/<source>.json(l) files into the SQLite catalog in one transaction.
+    Already imported sources are replaced. Returns {source: entry_count}.
+    """
+    data_dir = Path(data_dir)
+    db_path = Path(db_path) if db_path else data_dir / DB_FILENAME
+    files = _source_files(data_dir, sources)
+
+    conn = sqlite3.connect(db_path)
+    counts = {}
+    try:
+        conn.executescript(SCHEMA)
+        try:
+            conn.executescript(FTS_SCHEMA)
+            has_fts = True
+        except sqlite3.OperationalError as e:
+            print(f"[DataStore] Full-text index disabled: {e}")
+            has_fts = False
+        with conn:
+            for source, path in sorted(files.items()):
+                st = os.stat(path)
+                conn.execute("DELETE FROM entries WHERE source = ?", (source,))
+                cursor = conn.executemany(
+                    "INSERT INTO entries (source, position, name, name_key, description)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (
+                        (source, position, name, name.casefold(), description)
+                        for position, (name, description) in enumerate(_iter_items(path))
+                    ),
+                )
+                counts[source] = cursor.rowcount
+                conn.execute(
+                    "INSERT OR REPLACE INTO sources"
+                    " (source, file_name, file_mtime_ns, file_size, entry_count, imported_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (source, path.name, st.st_mtime_ns, st.st_size, counts[source], time.time()),
+                )
+            if has_fts:
+                conn.execute("INSERT INTO entries_fts(entries_fts) VALUES ('rebuild')")
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+    for source, count in counts.items():
+        print(f"[DataStore] Imported '{source}': {count} entries")
+    return counts
+
+
+class SqliteDataStore:
+    """
+    Read-only access to data/catalog.sqlite.
+    Connections are pooled per thread (sqlite3 connections are not shared between threads).
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._version = None
+        self._generation = 0
+        self._sources = {}
+        self._payloads = {}
+        self._has_fts = False
+
+    # --- connection / metadata ---
+
+    def _stat_version(self):
+        try:
+            st = os.stat(self.db_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def available(self):
+        return self._refresh() is not None
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        # the database file may have been replaced → reopen this thread's connection
+        if conn is not None and self._local.generation != self._generation:
+            conn.close()
+            conn = None
+        if conn is None:
+            conn = sqlite3.connect(f"{self.db_path.as_uri()}?mode=ro", uri=True)
+            conn.execute("PRAGMA query_only = ON")
+            self._local.conn = conn
+            self._local.generation = self._generation
+        return conn
+
+    def _refresh(self):
+        """Reloads the sources table when the database file changed. Returns the db version."""
+        version = self._stat_version()
+        if version == self._version:
+            return version
+        with self._lock:
+            if version == self._version:
+                return version
+            self._generation += 1
+            sources = {}
+            has_fts = False
+            if version is not None:
+                try:
+                    conn = self._connection()
+                    rows = conn.execute(
+                        "SELECT source, file_name, file_mtime_ns, file_size FROM sources"
+                    ).fetchall()
+                    sources = {r[0]: (r[1], r[2], r[3]) for r in rows}
+                    has_fts = conn.execute(
+                        "SELECT 1 FROM sqlite_master WHERE name = 'entries_fts'"
+                    ).fetchone() is not None
+                except sqlite3.Error as e:
+                    print(f"[DataStore] Cannot read '{self.db_path}': {e}")
+                    version = None
+            self._sources = sources
+            self._has_fts = has_fts
+            self._payloads = {}
+            self._version = version
+            return version
+
+    def sources(self):
+        self._refresh()
+        return sorted(self._sources)
+
+    def has_source(self, source, path=None):
+        """
+        True if the source was imported. When the current source file is given,
+        the import must also match its mtime/size, otherwise the file is newer
+        and the caller should fall back to reading it.
+        """
+        self._refresh()
+        record = self._sources.get(source)
+        if record is None:
+            return False
+        if path is None:
+            return True
+        try:
+            st = os.stat(path)
+        except OSError:
+            return True
+        file_name, mtime_ns, size = record
+        return path.name == file_name and st.st_mtime_ns == mtime_ns and st.st_size == size
+
+    # --- lookups ---
+
+    def names(self, source):
+        rows = self._connection().execute(
+            "SELECT name FROM entries WHERE source = ? ORDER BY position", (source,)
+        ).fetchall()
+        return tuple(r[0] for r in rows)
+
+    def all_names(self, sources):
+        sources = list(sources)
+        if not sources:
+            return []
+        marks = ", ".join("?" * len(sources))
+        rows = self._connection().execute(
+            f"SELECT DISTINCT name FROM entries WHERE source IN ({marks})", sources
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def get(self, source, name):
+        row = self._connection().execute(
+            "SELECT description FROM entries WHERE source = ? AND name = ?"
+            " ORDER BY position LIMIT 1",
+            (source, name),
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def etag(self, source):
+        version = self._refresh()
+        mtime_ns, size = version or (0, 0)
+        return f'"db-{zlib.crc32(source.encode("utf-8")):x}-{mtime_ns:x}-{size:x}"'
+
+    def names_payload(self, source):
+        """(etag, {"names": [...]} bytes), serialized once per database version."""
+        self._refresh()
+        payload = self._payloads.get(source)
+        if payload is None:
+            body = dumps_bytes({"names": list(self.names(source))})
+            payload = (self.etag(source), body)
+            self._payloads[source] = payload
+        return payload
+
+    def search(self, source, prefix="", query="", offset=0, limit=50):
+        where = ["source = ?"]
+        params = [source]
+
+        p = (prefix or "").casefold()
+        if p:
+            where.append("name_key >= ? AND name_key < ?")
+            params += [p, p[:-1] + chr(ord(p[-1]) + 1)]
+
+        q = (query or "").casefold()
+        if q:
+            where.append("instr(name_key, ?) > 0")
+            params.append(q)
+
+        conn = self._connection()
+        clause = " AND ".join(where)
+        total = conn.execute(
+            f"SELECT COUNT(DISTINCT name) FROM entries WHERE {clause}", params
+        ).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT name FROM entries WHERE {clause}"
+            " GROUP BY name ORDER BY MIN(name_key), name LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+        return total, [r[0] for r in rows]
+
+    def search_descriptions(self, source, text, offset=0, limit=50):
+        """
+        Full-text search over descriptions (FTS5), best matches first.
+        Without the FTS table (SQLite built without FTS5) this is a substring
+        search in import order.
+        """
+        if not text or not text.strip():
+            return 0, []
+        self._refresh()
+        if self._has_fts:
+            try:
+                return self._search_fts(source, text, offset, limit)
+            except sqlite3.OperationalError as e:
+                # the table exists, but this SQLite cannot read it (no fts5 module)
+                print(f"[DataStore] Full-text search unavailable, using LIKE: {e}")
+                self._has_fts = False
+        return self._search_like(source, text, offset, limit)
+
+    def _search_fts(self, source, text, offset, limit):
+        match = '"' + text.replace('"', '""') + '"'
+        conn = self._connection()
+        total = conn.execute(
+            "SELECT COUNT(*) FROM entries_fts f JOIN entries e ON e.id = f.rowid"
+            " WHERE entries_fts MATCH ? AND e.source = ?",
+            (match, source),
+        ).fetchone()[0]
+        rows = conn.execute(
+            "SELECT e.name FROM entries_fts f JOIN entries e ON e.id = f.rowid"
+            " WHERE entries_fts MATCH ? AND e.source = ? ORDER BY f.rank LIMIT ? OFFSET ?",
+            (match, source, limit, offset),
+        ).fetchall()
+        return total, [r[0] for r in rows]
+
+    def _search_like(self, source, text, offset, limit):
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        conn = self._connection()
+        total = conn.execute(
+            "SELECT COUNT(*) FROM entries WHERE source = ? AND description LIKE ? ESCAPE '\\'",
+            (source, pattern),
+        ).fetchone()[0]
+        rows = conn.execute(
+            "SELECT name FROM entries WHERE source = ? AND description LIKE ? ESCAPE '\\'"
+            " ORDER BY position LIMIT ? OFFSET ?",
+            (source, pattern, limit, offset),
+        ).fetchall()
+        return total, [r[0] for r in rows]
+
+
+SQLITE_STORE = SqliteDataStore(DATA_DIR / DB_FILENAME)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DataFileLoader SQLite catalog tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import", help="bulk-import data/*.json(l) sources")
+    imp.add_argument("sources", nargs="*", help="source names (default: all)")
+    imp.add_argument("--data-dir", default=str(DATA_DIR))
+    imp.add_argument("--db", default=None, help=f"database path (default: <data-dir>/{DB_FILENAME})")
+
+    args = parser.parse_args(argv)
+    if args.command == "import":
+        started = time.perf_counter()
+        counts = import_sources(args.data_dir, args.db, args.sources or None)
+        elapsed = time.perf_counter() - started
+        print(f"[DataStore] {sum(counts.values())} entries from {len(counts)} sources in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Disk-to-disk export of grid sheets: decode -> grid crop -> optional trim/resize -> encode.
+
+Unlike the IMAGE based nodes, sheets are never turned into float32 tensors: every
+worker decodes one sheet to uint8, cuts it with the same grid/trim logic as
+ImageGridCropper / BatchImageCrop and writes the tiles straight back to disk.
+
+CLI (process pool):
+    python dataset_export.py <input_dir> --crop-dir DIR [--dataset-dir DIR]
+        --rows 2 --cols 2 --block-width 256 --block-height 256 [--trim] [--size 1024x1024]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+import torch
+from PIL import Image
+
+if __package__:
+    from .image_process import TRIM_BACKGROUNDS, _background_colors, _content_boxes, _split_grid
+    from .image_writer import SAVE_FORMATS, encoder_options, to_pil
+else:
+    # executed as a script: expose this folder as a package so the relative imports above work
+    import sys
+    import types
+
+    _package = types.ModuleType("stalkervr_path_nodes")
+    _package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+    sys.modules.setdefault("stalkervr_path_nodes", _package)
+    from stalkervr_path_nodes.image_process import TRIM_BACKGROUNDS, _background_colors, _content_boxes, _split_grid
+    from stalkervr_path_nodes.image_writer import SAVE_FORMATS, encoder_options, to_pil
+
+INPUT_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def _list_sheets(input_dir):
+    return sorted(
+        p for p in Path(input_dir).iterdir()
+        if p.is_file() and p.suffix.lower() in INPUT_EXTENSIONS
+    )
+
+
+def _export_sheet(path, options):
+    """
+    Process one sheet (runs inside a worker). Peak memory is one decoded uint8
+    sheet plus its tiles. Returns (sheet path, crop files written, dataset files written).
+    """
+    rows, cols = options["rows"], options["cols"]
+    block_width, block_height = options["block_width"], options["block_height"]
+    ext, save_kwargs = encoder_options(
+        options["image_format"], options["png_compress_level"], options["quality"], options["webp_lossless"]
+    )
+
+    with Image.open(path) as img:
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+        pixels = torch.from_numpy(np.array(img))  # [H, W, C] uint8
+
+    tiles = _split_grid(pixels.unsqueeze(0), rows, cols, block_height, block_width)
+    stem = Path(path).stem
+    names = [f"{stem}_{row}_{col}" for row in range(rows) for col in range(cols)]
+
+    crop_written = 0
+    if options["crop_dir"]:
+        for tile, name in zip(tiles.numpy(), names):
+            to_pil(tile).save(os.path.join(options["crop_dir"], f"{name}.{ext}"), **save_kwargs)
+            crop_written += 1
+
+    dataset_written = 0
+    if options["dataset_dir"]:
+        if options["trim"]:
+            # int16 keeps the background difference signed without a float copy of the tiles
+            signed = tiles.to(torch.int16)
+            background = _background_colors(signed, options["trim_background"], white=255)
+            boxes = _content_boxes(signed, background, options["trim_tolerance"] * 255).tolist()
+        else:
+            boxes = [[0, 0, block_width, block_height]] * len(names)
+
+        size = options["dataset_size"]
+        for tile, (left, top, right, bottom), name in zip(tiles.numpy(), boxes, names):
+            pil_img = to_pil(tile[top:bottom, left:right])
+            if size:
+                pil_img = pil_img.resize(size, Image.LANCZOS)
+            if save_kwargs.get("format") == "JPEG" and pil_img.mode == "RGBA":
+                pil_img = pil_img.convert("RGB")
+            pil_img.save(os.path.join(options["dataset_dir"], f"{name}.{ext}"), **save_kwargs)
+            dataset_written += 1
+
+    return str(path), crop_written, dataset_written
+
+
+def export_grid_folder(
+    input_dir,
+    crop_dir="",
+    dataset_dir="",
+    rows=2,
+    cols=2,
+    block_width=256,
+    block_height=256,
+    trim=False,
+    trim_background="auto",
+    trim_tolerance=0.05,
+    dataset_size=None,
+    image_format="png",
+    png_compress_level=6,
+    quality=95,
+    webp_lossless=False,
+    workers=None,
+    use_processes=True,
+):
+    """
+    Streams every sheet of input_dir through the pipeline with at most 2 * workers
+    sheets in flight. Returns a stats dict including images_per_second (sheets).
+    """
+    if not crop_dir and not dataset_dir:
+        raise ValueError("Nothing to do: set crop_dir and/or dataset_dir")
+
+    sheets = _list_sheets(input_dir)
+    for folder in (crop_dir, dataset_dir):
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+    options = {
+        "rows": rows,
+        "cols": cols,
+        "block_width": block_width,
+        "block_height": block_height,
+        "crop_dir": crop_dir,
+        "dataset_dir": dataset_dir,
+        "trim": trim,
+        "trim_background": trim_background,
+        "trim_tolerance": trim_tolerance,
+        "dataset_size": tuple(dataset_size) if dataset_size else None,
+        "image_format": image_format,
+        "png_compress_level": png_compress_level,
+        "quality": quality,
+        "webp_lossless": webp_lossless,
+    }
+
+    workers = workers or min(8, os.cpu_count() or 1)
+    pool_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    stats = {"sheets": 0, "crops": 0, "dataset_images": 0, "errors": []}
+
+    started = time.perf_counter()
+    with pool_cls(max_workers=workers) as pool:
+        queue = iter(sheets)
+        in_flight = set()
+        while True:
+            # bounded window → pending work never holds more than 2 * workers sheets
+            while len(in_flight) < workers * 2:
+                path = next(queue, None)
+                if path is None:
+                    break
+                in_flight.add(pool.submit(_export_sheet, path, options))
+            if not in_flight:
+                break
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    _, crops, dataset_images = future.result()
+                except Exception as e:
+                    stats["errors"].append(str(e))
+                    print(f"[GridFolderExport] Failed: {e}")
+                    continue
+                stats["sheets"] += 1
+                stats["crops"] += crops
+                stats["dataset_images"] += dataset_images
+
+    elapsed = time.perf_counter() - started
+    stats["seconds"] = elapsed
+    stats["images_per_second"] = stats["sheets"] / elapsed if elapsed > 0 else 0.0
+    print(
+        f"[GridFolderExport] {stats['sheets']} sheets → {stats['crops']} crops, "
+        f"{stats['dataset_images']} dataset images in {elapsed:.2f}s "
+        f"({stats['images_per_second']:.2f} images/s)"
+    )
+    return stats
+
+
+class GridFolderExport:
+    """
+    Crop a whole folder of grid sheets straight from disk to disk
+    (CHARACTER_GRID_CROP_FOLDER / CHARACTER_DATASET_FOLDER layout).
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "input_folder": ("STRING", {"default": ""}),
+                "crop_folder": ("STRING", {"default": ""}),
+                "dataset_folder": ("STRING", {"default": ""}),
+                "rows": ("INT", {"default": 2, "min": 1}),
+                "cols": ("INT", {"default": 2, "min": 1}),
+                "block_width": ("INT", {"default": 256, "min": 1}),
+                "block_height": ("INT", {"default": 256, "min": 1}),
+                "trim": ("BOOLEAN", {"default": False}),
+                "trim_background": (TRIM_BACKGROUNDS, {"default": "auto"}),
+                "trim_tolerance": ("FLOAT", {"default": 0.05, "min": 0.0, "max": 1.0, "step": 0.01}),
+                # 0 x 0 → keep the (trimmed) tile size
+                "dataset_width": ("INT", {"default": 0, "min": 0}),
+                "dataset_height": ("INT", {"default": 0, "min": 0}),
+                "image_format": (SAVE_FORMATS, {"default": "png"}),
+                "png_compress_level": ("INT", {"default": 6, "min": 0, "max": 9}),
+                "quality": ("INT", {"default": 95, "min": 1, "max": 100}),
+                "webp_lossless": ("BOOLEAN", {"default": False}),
+                "workers": ("INT", {"default": 0, "min": 0, "max": 64}),
+            },
+            "optional": {
+                # overrides crop_folder / dataset_folder with the SavePath layout
+                "path_pipe": ("PATH_PIPE",),
+            }
+        }
+
+    RETURN_TYPES = ("STRING", "INT", "FLOAT")
+    RETURN_NAMES = ("summary", "sheets", "images_per_second")
+    OUTPUT_NODE = True
+    FUNCTION = "export"
+    CATEGORY = "Stalkervr/Images"
+    DESCRIPTION = "Crop a folder of grid sheets disk-to-disk without loading them as IMAGE tensors"
+
+    @classmethod
+    def IS_CHANGED(cls, input_folder, **kwargs):
+        # the inputs are only folder strings: re-run when sheets are added, removed or rewritten
+        try:
+            signature = []
+            for path in _list_sheets(input_folder):
+                st = path.stat()
+                signature.append((path.name, st.st_mtime_ns, st.st_size))
+            return signature
+        except OSError:
+            # missing folder: let export() report the error
+            return None
+
+    def export(
+        self,
+        input_folder,
+        crop_folder,
+        dataset_folder,
+        rows,
+        cols,
+        block_width,
+        block_height,
+        trim,
+        trim_background,
+        trim_tolerance,
+        dataset_width,
+        dataset_height,
+        image_format,
+        png_compress_level,
+        quality,
+        webp_lossless,
+        workers,
+        path_pipe=None,
+    ):
+        if path_pipe:
+            crop_folder = path_pipe[3] or crop_folder
+            dataset_folder = path_pipe[4] or dataset_folder
+
+        dataset_size = (dataset_width, dataset_height) if dataset_width and dataset_height else None
+
+        # threads inside ComfyUI: spawned processes would re-import this node package,
+        # which needs the running PromptServer; decode/encode/torch release the GIL anyway
+        stats = export_grid_folder(
+            input_folder, crop_folder, dataset_folder,
+            rows, cols, block_width, block_height,
+            trim, trim_background, trim_tolerance, dataset_size,
+            image_format, png_compress_level, quality, webp_lossless,
+            workers=workers or None, use_processes=False,
+        )
+
+        summary = (
+            f"{stats['sheets']} sheets, {stats['crops']} crops, {stats['dataset_images']} dataset images, "
+            f"{stats['seconds']:.2f}s ({stats['images_per_second']:.2f} images/s), "
+            f"{len(stats['errors'])} errors"
+        )
+        return {"ui": {"text": [summary]}, "result": (summary, stats["sheets"], stats["images_per_second"])}
+
+
+def _parse_size(value):
+    w, h = value.lower().split("x")
+    return int(w), int(h)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crop a folder of grid sheets disk-to-disk")
+    parser.add_argument("input_dir")
+    parser.add_argument("--crop-dir", default="")
+    parser.add_argument("--dataset-dir", default="")
+    parser.add_argument("--rows", type=int, default=2)
+    parser.add_argument("--cols", type=int, default=2)
+    parser.add_argument("--block-width", type=int, default=256)
+    parser.add_argument("--block-height", type=int, default=256)
+    parser.add_argument("--trim", action="store_true")
+    parser.add_argument("--trim-background", choices=TRIM_BACKGROUNDS, default="auto")
+    parser.add_argument("--trim-tolerance", type=float, default=0.05)
+    parser.add_argument("--size", type=_parse_size, default=None, help="dataset image size, e.g. 1024x1024")
+    parser.add_argument("--format", choices=SAVE_FORMATS, default="png")
+    parser.add_argument("--compress-level", type=int, default=6)
+    parser.add_argument("--quality", type=int, default=95)
+    parser.add_argument("--lossless", action="store_true")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    stats = export_grid_folder(
+        args.input_dir, args.crop_dir, args.dataset_dir,
+        args.rows, args.cols, args.block_width, args.block_height,
+        args.trim, args.trim_background, args.trim_tolerance, args.size,
+        args.format, args.compress_level, args.quality, args.lossless,
+        workers=args.workers, use_processes=True,
+    )
+    if stats["errors"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,195 @@
 import os
 import torch
-import numpy as np
 import torch.nn.functional as F
-from PIL import Image
+
+from .image_writer import IMAGE_WRITER, SAVE_FORMATS, encoder_options, to_uint8
+
+
+# Optional encoder inputs shared by the nodes that can save to a folder
+SAVE_OPTION_INPUTS = {
+    "image_format": (SAVE_FORMATS, {"default": "png"}),
+    "png_compress_level": ("INT", {"default": 6, "min": 0, "max": 9}),
+    "quality": ("INT", {"default": 95, "min": 1, "max": 100}),
+    "webp_lossless": ("BOOLEAN", {"default": False}),
+}
+
+
+def _save_images(images, save_path: str, names, wait: bool,
+                 image_format="png", png_compress_level=6, quality=95, webp_lossless=False):
+    """
+    Queue [N, H, W, C] images as <save_path>/<name>.<ext> on the shared background writer.
+    With wait=True blocks until everything is written and raises on failures.
+    """
+    for error in IMAGE_WRITER.pop_errors():
+        print(f"[ImageWriter] Previous save failed: {error}")
+
+    ext, save_kwargs = encoder_options(image_format, png_compress_level, quality, webp_lossless)
+
+    # one uint8 conversion for the whole batch; the writer gets contiguous slices of it
+    pixels = to_uint8(images)
+
+    os.makedirs(save_path, exist_ok=True)
+    for image, name in zip(pixels, names):
+        IMAGE_WRITER.submit(f"{save_path}/{name}.{ext}", image, **save_kwargs)
+
+    if wait:
+        errors = IMAGE_WRITER.flush()
+        if errors:
+            raise RuntimeError(f"Failed to save {len(errors)} image(s), first error: {errors[0]}")
+
+
+RESIZE_MODES = ["bilinear", "bicubic", "area", "nearest", "lanczos"]
+
+
+def _interpolate(images_nchw: torch.Tensor, size, mode: str) -> torch.Tensor:
+    # torch has no lanczos kernel: antialiased bicubic is the closest equivalent
+    if mode == "lanczos":
+        return F.interpolate(images_nchw, size=size, mode="bicubic", align_corners=False, antialias=True).clamp_(0, 1)
+    if mode == "bicubic":
+        return F.interpolate(images_nchw, size=size, mode="bicubic", align_corners=False).clamp_(0, 1)
+    if mode == "bilinear":
+        return F.interpolate(images_nchw, size=size, mode="bilinear", align_corners=False)
+    if mode in ("area", "nearest"):
+        return F.interpolate(images_nchw, size=size, mode=mode)
+    raise ValueError(f"Unsupported resize mode '{mode}', expected one of {RESIZE_MODES}")
+
+
+def _resize_nhwc(images: torch.Tensor, height: int, width: int, mode: str = "bilinear",
+                 max_chunk_bytes: int = 0) -> torch.Tensor:
+    """
+    Resize [B, H, W, C] → [B, height, width, C].
+
+    Works in channels_last memory format, so the NHWC <-> NCHW permutes are views
+    rather than copies. With max_chunk_bytes > 0 the batch is processed in slices
+    whose input + output stay within the budget, written into one preallocated
+    output tensor, so peak memory no longer scales with the whole batch.
+    """
+    b, h, w, c = images.shape
+    per_image = (h * w + height * width) * c * images.element_size()
+    chunk = b if max_chunk_bytes <= 0 else max(1, min(b, max_chunk_bytes // per_image))
+
+    def resize(part):
+        # [N, H, W, C] → NCHW view with channels_last strides (copies only a non-dense slice)
+        src = part.permute(0, 3, 1, 2).contiguous(memory_format=torch.channels_last)
+        return _interpolate(src, (height, width), mode).permute(0, 2, 3, 1)
+
+    if chunk >= b:
+        return resize(images)
+
+    out = images.new_empty((b, height, width, c))
+    for start in range(0, b, chunk):
+        out[start:start + chunk].copy_(resize(images[start:start + chunk]))
+    return out
+
+
+CROP_MODES = ["fixed", "auto_trim"]
+TRIM_BACKGROUNDS = ["auto", "black", "white"]
+TRIM_FITS = ["pad", "resize"]
+
+
+def _background_colors(images: torch.Tensor, background: str, white: float = 1.0) -> torch.Tensor:
+    """
+    [B, C] border color per image: median of the four corners, or plain black/white.
+    `white` is the full-scale value (1.0 for IMAGE tensors, 255 for uint8 pixels).
+    """
+    b, _, _, c = images.shape
+    if background == "black":
+        return images.new_zeros((b, c))
+    if background == "white":
+        return images.new_full((b, c), white)
+    corners = torch.stack([
+        images[:, 0, 0, :], images[:, 0, -1, :], images[:, -1, 0, :], images[:, -1, -1, :]
+    ])
+    return corners.median(dim=0).values
+
+
+def _content_boxes(images: torch.Tensor, background_colors: torch.Tensor, tolerance: float) -> torch.Tensor:
+    """
+    Content bounds of every image at once → [B, 4] long (left, top, right, bottom),
+    right/bottom exclusive. Pixels differing from the background by more than
+    `tolerance` in any channel count as content; empty images keep the full frame.
+    """
+    _, h, w, _ = images.shape
+    content = (images - background_colors[:, None, None, :]).abs().amax(dim=-1) > tolerance  # [B, H, W]
+    rows = content.any(dim=2).float()  # [B, H]
+    cols = content.any(dim=1).float()  # [B, W]
+
+    # argmax returns the first maximum → first / last row and column with content
+    top = rows.argmax(dim=1)
+    bottom = h - rows.flip(1).argmax(dim=1)
+    left = cols.argmax(dim=1)
+    right = w - cols.flip(1).argmax(dim=1)
+
+    boxes = torch.stack([left, top, right, bottom], dim=1)
+    full = torch.tensor([0, 0, w, h], device=boxes.device, dtype=boxes.dtype)
+    has_content = rows.amax(dim=1) > 0
+    return torch.where(has_content[:, None], boxes, full)
+
+
+def _pad_boxes(images: torch.Tensor, boxes: torch.Tensor, out_h: int, out_w: int,
+               fill: torch.Tensor) -> torch.Tensor:
+    """
+    Cut every box out of its image and center it on an out_h x out_w canvas filled
+    with `fill` ([B, C]), as one batched gather.
+    """
+    b, h, w, _ = images.shape
+    left, top, right, bottom = boxes.unbind(dim=1)
+    device = images.device
+
+    ys = (top - (out_h - (bottom - top)) // 2)[:, None] + torch.arange(out_h, device=device)[None, :]
+    xs = (left - (out_w - (right - left)) // 2)[:, None] + torch.arange(out_w, device=device)[None, :]
+    valid = (
+        ((ys >= top[:, None]) & (ys < bottom[:, None]))[:, :, None]
+        & ((xs >= left[:, None]) & (xs < right[:, None]))[:, None, :]
+    )
+
+    batch_idx = torch.arange(b, device=device)[:, None, None]
+    out = images[batch_idx, ys.clamp(0, h - 1)[:, :, None], xs.clamp(0, w - 1)[:, None, :]]
+    return torch.where(valid[..., None], out, fill[:, None, None, :])
+
+
+def _resize_boxes(images: torch.Tensor, boxes: torch.Tensor, out_h: int, out_w: int) -> torch.Tensor:
+    """Resample every box to out_h x out_w in one batched grid_sample call."""
+    b, h, w, c = images.shape
+    left, top, right, bottom = boxes.to(images.dtype).unbind(dim=1)
+
+    # box edges in normalized [-1, 1] coordinates (align_corners=False → pixel edges)
+    theta = images.new_zeros((b, 2, 3))
+    theta[:, 0, 0] = (right - left) / w
+    theta[:, 0, 2] = (left + right) / w - 1
+    theta[:, 1, 1] = (bottom - top) / h
+    theta[:, 1, 2] = (top + bottom) / h - 1
+
+    grid = F.affine_grid(theta, [b, c, out_h, out_w], align_corners=False)
+    out = F.grid_sample(images.permute(0, 3, 1, 2), grid, mode="bilinear", padding_mode="border",
+                        align_corners=False)
+    return out.permute(0, 2, 3, 1)
+
+
+def _split_grid(images: torch.Tensor, rows: int, cols: int, block_height: int, block_width: int) -> torch.Tensor:
+    """
+    Split [B, H, W, C] into [B * rows * cols, block_height, block_width, C],
+    ordered by image, then row-major tile order. Edge tiles that run past the
+    image are zero padded.
+
+    The grid is cut with a single reshape/permute instead of per-tile slicing:
+    when the images already cover the grid no padding buffer is allocated, and the
+    result stays a view of the input whenever the tile layout allows it (single row or
+    column), otherwise exactly one copy is made.
+    """
+    b, _, _, c = images.shape
+    grid_h = rows * block_height
+    grid_w = cols * block_width
+
+    region = images[:, :grid_h, :grid_w, :]
+    if region.shape[1] < grid_h or region.shape[2] < grid_w:
+        # one zero-filled buffer for the whole grid instead of padding every edge tile
+        padded = images.new_zeros((b, grid_h, grid_w, c))
+        padded[:, :region.shape[1], :region.shape[2], :] = region
+        region = padded
+
+    tiles = region.reshape(b, rows, block_height, cols, block_width, c).permute(0, 1, 3, 2, 4, 5)
+    return tiles.reshape(b * rows * cols, block_height, block_width, c)
 
 class ImageGridCropper:
     @classmethod
@@ -17,11 +204,18 @@ class ImageGridCropper:
                 "save_path": ("STRING", {"default": ""}),
                 "filename": ("STRING", {"default": "crop"}),
                 "save_to_folder": ("BOOLEAN", {"default": False}),
+            },
+            "optional": {
+                # False: only the first image of the batch (original behaviour)
+                "process_batch": ("BOOLEAN", {"default": False}),
+                # True: block until all files are written (saving runs in background otherwise)
+                "wait_for_save": ("BOOLEAN", {"default": False}),
+                **SAVE_OPTION_INPUTS,
             }
         }
 
-    RETURN_TYPES = ("IMAGE",)
-    RETURN_NAMES = ("images",)
+    RETURN_TYPES = ("IMAGE", "LIST")
+    RETURN_NAMES = ("images", "tile_info")
     FUNCTION = "crop_grid"
     CATEGORY = "Stalkervr/Images"
 
@@ -35,55 +229,45 @@ class ImageGridCropper:
         save_path: str,
         filename: str,
         save_to_folder: bool,
+        process_batch: bool = False,
+        wait_for_save: bool = False,
+        image_format: str = "png",
+        png_compress_level: int = 6,
+        quality: int = 95,
+        webp_lossless: bool = False,
     ):
         if image.ndim == 4:
-            img = image[0]
+            batch = image if process_batch else image[:1]
         elif image.ndim == 3:
-            img = image
+            batch = image.unsqueeze(0)
         else:
             raise ValueError(f"Unsupported image shape {image.shape}")
 
-        h, w, c = img.shape
+        batch_size, _, _, c = batch.shape
         if c not in [1, 3, 4]:
             raise ValueError(f"Unsupported channel count: expected 1, 3 or 4 but got {c}")
 
-        crops = []
-        for row in range(rows):
-            for col in range(cols):
-                x1 = col * block_width
-                y1 = row * block_height
-                x2 = min(x1 + block_width, w)
-                y2 = min(y1 + block_height, h)
-
-                crop = img[y1:y2, x1:x2, :]
-                pad_w = block_width - (x2 - x1)
-                pad_h = block_height - (y2 - y1)
-                if pad_w > 0 or pad_h > 0:
-                    crop = torch.nn.functional.pad(
-                        crop.permute(2, 0, 1),
-                        (0, pad_w, 0, pad_h),
-                        mode='constant', value=0
-                    ).permute(1, 2, 0)
-
-                crops.append(crop)
-
-                if save_to_folder and save_path:
-                    os.makedirs(save_path, exist_ok=True)
-                    from PIL import Image
-                    np_img = (crop.numpy() * 255).astype(np.uint8)
-                    if c == 1:
-                        np_img = np_img[:, :, 0]
-                        mode = "L"
-                    elif c == 3:
-                        mode = "RGB"
-                    else:
-                        mode = "RGBA"
-                    pil_img = Image.fromarray(np_img, mode=mode)
-                    pil_img.save(f"{save_path}/{filename}_{row}_{col}.png")
-
-        batch = torch.stack(crops, dim=0)
-
-        return (batch,)
+        tiles = _split_grid(batch, rows, cols, block_height, block_width)
+
+        # (batch_idx, row, col) for every tile, in output order
+        tile_info = [
+            (b, row, col)
+            for b in range(batch_size)
+            for row in range(rows)
+            for col in range(cols)
+        ]
+
+        if save_to_folder and save_path:
+            names = [
+                f"{filename}_{b}_{row}_{col}" if process_batch else f"{filename}_{row}_{col}"
+                for b, row, col in tile_info
+            ]
+            _save_images(
+                tiles, save_path, names, wait_for_save,
+                image_format, png_compress_level, quality, webp_lossless,
+            )
+
+        return (tiles, tile_info)
     
 class BatchImageCrop:
     @classmethod
@@ -99,11 +283,25 @@ class BatchImageCrop:
                 "save_path": ("STRING", {"default": ""}),
                 "filename": ("STRING", {"default": "crop"}),
                 "save_to_folder": ("BOOLEAN", {"default": False}),
+            },
+            "optional": {
+                # True: block until all files are written (saving runs in background otherwise)
+                "wait_for_save": ("BOOLEAN", {"default": False}),
+                **SAVE_OPTION_INPUTS,
+                "resize_mode": (RESIZE_MODES, {"default": "bilinear"}),
+                # memory budget for one restore_size chunk, 0 = whole batch at once
+                "max_chunk_mb": ("INT", {"default": 1024, "min": 0}),
+                # auto_trim: after the fixed margins, trim each image to its own content box
+                "crop_mode": (CROP_MODES, {"default": "fixed"}),
+                "trim_background": (TRIM_BACKGROUNDS, {"default": "auto"}),
+                "trim_tolerance": ("FLOAT", {"default": 0.05, "min": 0.0, "max": 1.0, "step": 0.01}),
+                # how trimmed boxes of different sizes are brought to one batch size
+                "trim_fit": (TRIM_FITS, {"default": "pad"}),
             }
         }
 
-    RETURN_TYPES = ("IMAGE",)
-    RETURN_NAMES = ("cropped_images",)
+    RETURN_TYPES = ("IMAGE", "LIST")
+    RETURN_NAMES = ("cropped_images", "crop_boxes")
     FUNCTION = "crop_batch"
     CATEGORY = "Stalkervr/Images"
 
@@ -118,6 +316,17 @@ class BatchImageCrop:
         save_path: str,
         filename: str,
         save_to_folder: bool,
+        wait_for_save: bool = False,
+        image_format: str = "png",
+        png_compress_level: int = 6,
+        quality: int = 95,
+        webp_lossless: bool = False,
+        resize_mode: str = "bilinear",
+        max_chunk_mb: int = 1024,
+        crop_mode: str = "fixed",
+        trim_background: str = "auto",
+        trim_tolerance: float = 0.05,
+        trim_fit: str = "pad",
     ):
         if images.ndim != 4:
             raise ValueError("Input must be a batch of images with shape [B, H, W, C]")
@@ -133,29 +342,33 @@ class BatchImageCrop:
 
         cropped_images = images[:, y1:y2, x1:x2, :]
 
+        if crop_mode == "auto_trim":
+            background = _background_colors(cropped_images, trim_background)
+            boxes = _content_boxes(cropped_images, background, trim_tolerance)
+            out_w = int((boxes[:, 2] - boxes[:, 0]).max())
+            out_h = int((boxes[:, 3] - boxes[:, 1]).max())
+            if trim_fit == "resize":
+                cropped_images = _resize_boxes(cropped_images, boxes, out_h, out_w)
+            else:
+                cropped_images = _pad_boxes(cropped_images, boxes, out_h, out_w, background)
+            # boxes in source image coordinates
+            offset = torch.tensor([x1, y1, x1, y1], device=boxes.device, dtype=boxes.dtype)
+            crop_boxes = (boxes + offset).tolist()
+        else:
+            crop_boxes = [[x1, y1, x2, y2] for _ in range(batch_size)]
+
         if restore_size:
-            cropped_images = cropped_images.permute(0, 3, 1, 2)  # [B, C, H, W]
-            resized_images = F.interpolate(cropped_images, size=(h, w), mode='bilinear', align_corners=False)
-            cropped_images = resized_images.permute(0, 2, 3, 1)  # обратно [B, H, W, C]
+            cropped_images = _resize_nhwc(cropped_images, h, w, resize_mode, max_chunk_mb * 1024 * 1024)
 
-        # Сохраняем, если требуется
+        # Сохраняем, если требуется (в фоне, см. image_writer)
         if save_to_folder and save_path:
-            os.makedirs(save_path, exist_ok=True)
-            from PIL import Image
-            for idx in range(batch_size):
-                img = cropped_images[idx]
-                np_img = (img.numpy() * 255).astype(np.uint8)
-                if c == 1:
-                    np_img = np_img[:, :, 0]
-                    mode = "L"
-                elif c == 3:
-                    mode = "RGB"
-                else:
-                    mode = "RGBA"
-                pil_img = Image.fromarray(np_img, mode=mode)
-                pil_img.save(f"{save_path}/{filename}_{idx}.png")
+            names = [f"{filename}_{idx}" for idx in range(batch_size)]
+            _save_images(
+                cropped_images, save_path, names, wait_for_save,
+                image_format, png_compress_level, quality, webp_lossless,
+            )
 
-        return (cropped_images,)
+        return (cropped_images, crop_boxes)
 
 
 
@@ -265,3 +478,223 @@ class AutoAspectRatioAdjustFixer:
             target_height = int(w / target_ratio)
 
         return (image, target_width, target_height)
+
+class AspectRatioListCalculator(AutoAspectRatioAdjustFixer):
+    """
+    List version of AutoAspectRatioAdjustFixer / ImageAspectFixer.
+    Accepts a list of IMAGE batches with differing sizes and computes every target
+    size in one vectorized pass. Optionally snaps every image to the nearest of the
+    given training resolutions (aspect-ratio bucketing).
+    """
+
+    MODES = ["adjust", "fixer_16_9"]
+    DEFAULT_BUCKETS = "1024x1024, 1152x896, 896x1152, 1216x832, 832x1216, 1344x768, 768x1344, 1536x640, 640x1536"
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "images": ("IMAGE",),
+                # adjust: AutoAspectRatioAdjustFixer rules, fixer_16_9: ImageAspectFixer rules
+                "mode": (cls.MODES, {"default": "adjust"}),
+                "aspect_ratio": (cls.ASPECT_CHOICES, {"default": "16:9"}),
+                "custom_x": ("INT", {"default": 1, "min": 1}),
+                "custom_y": ("INT", {"default": 1, "min": 1}),
+            },
+            "optional": {
+                # "WxH, WxH, ..."; empty → no bucketing
+                "bucket_resolutions": ("STRING", {"default": cls.DEFAULT_BUCKETS, "multiline": False}),
+            }
+        }
+
+    INPUT_IS_LIST = True
+    RETURN_TYPES = ("IMAGE", "LIST", "LIST", "LIST", "LIST", "LIST")
+    RETURN_NAMES = ("source_images", "target_widths", "target_heights", "bucket_widths", "bucket_heights", "buckets")
+    OUTPUT_IS_LIST = (True, False, False, False, False, False)
+    FUNCTION = "calculate_list"
+    CATEGORY = "Stalkervr/Images"
+
+    @staticmethod
+    def parse_buckets(text):
+        buckets = []
+        for part in text.replace(";", ",").split(","):
+            part = part.strip().lower()
+            if not part:
+                continue
+            w, h = part.split("x")
+            buckets.append((int(w), int(h)))
+        return buckets
+
+    @staticmethod
+    def _targets_adjust(hs, ws, x, y):
+        # same rules as AutoAspectRatioAdjustFixer.calculate, for all images at once
+        is_vertical = hs > ws
+        target_ratio = torch.where(is_vertical, torch.full_like(hs, y / x), torch.full_like(hs, x / y))
+        wide = ws / hs > target_ratio
+        target_w = torch.where(wide, torch.floor(hs * target_ratio), ws)
+        target_h = torch.where(wide, hs, torch.floor(ws / target_ratio))
+        return target_w, target_h
+
+    @staticmethod
+    def _targets_fixer(hs, ws):
+        # same rules as ImageAspectFixer.fix_aspect
+        landscape = ws >= hs
+        target_w = torch.where(landscape, ws, torch.floor(hs * 9 / 16))
+        target_h = torch.where(landscape, torch.floor(ws * 9 / 16), hs)
+        return target_w.clamp(min=1), target_h.clamp(min=1)
+
+    def calculate_list(self, images, mode, aspect_ratio, custom_x, custom_y, bucket_resolutions=None):
+        # INPUT_IS_LIST → widgets arrive as one-element lists
+        mode = mode[0]
+        aspect_ratio = aspect_ratio[0]
+        custom_x = custom_x[0]
+        custom_y = custom_y[0]
+        bucket_resolutions = bucket_resolutions[0] if bucket_resolutions else ""
+
+        sizes = []
+        for image in images:
+            if not isinstance(image, torch.Tensor) or image.dim() != 4:
+                raise ValueError("IMAGE must be 4D: [B, H, W, C]")
+            b, h, w, _ = image.shape
+            sizes.extend([(h, w)] * b)
+
+        if not sizes:
+            return (images, [], [], [], [], [])
+
+        hw = torch.tensor(sizes, dtype=torch.float64)
+        hs, ws = hw[:, 0], hw[:, 1]
+
+        if mode == "fixer_16_9":
+            target_w, target_h = self._targets_fixer(hs, ws)
+        else:
+            x, y = self.parse_ratio(aspect_ratio, custom_x, custom_y)
+            target_w, target_h = self._targets_adjust(hs, ws, x, y)
+
+        bucket_widths, bucket_heights, labels = [], [], []
+        buckets = self.parse_buckets(bucket_resolutions)
+        if buckets:
+            bucket_wh = torch.tensor(buckets, dtype=torch.float64)
+            # nearest bucket by aspect ratio, measured in log space (2:1 and 1:2 are equally far from 1:1)
+            distance = (torch.log(ws / hs)[:, None] - torch.log(bucket_wh[:, 0] / bucket_wh[:, 1])[None, :]).abs()
+            nearest = distance.argmin(dim=1).tolist()
+            bucket_widths = [buckets[i][0] for i in nearest]
+            bucket_heights = [buckets[i][1] for i in nearest]
+            labels = [f"{buckets[i][0]}x{buckets[i][1]}" for i in nearest]
+
+        return (
+            images,
+            [int(v) for v in target_w.tolist()],
+            [int(v) for v in target_h.tolist()],
+            bucket_widths,
+            bucket_heights,
+            labels,
+        )
+
+class AspectRatioCropResize(AutoAspectRatioAdjustFixer):
+    """
+    AutoAspectRatioAdjustFixer that also produces the image: crops to the target
+    aspect ratio (center, fixed offset or saliency anchored) and optionally resizes,
+    batched in one node instead of separate crop and resize nodes.
+
+    Crop-only output is a view of the input. When resizing, the crop is
+    materialized chunk by chunk (max_chunk_mb) right before interpolation.
+    Setting only one of resize_width / resize_height derives the other from
+    the target aspect ratio.
+    """
+
+    ANCHORS = ["center", "offset", "saliency"]
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "image": ("IMAGE",),
+                "aspect_ratio": (cls.ASPECT_CHOICES, {"default": "16:9"}),
+                "custom_x": ("INT", {"default": 1, "min": 1}),
+                "custom_y": ("INT", {"default": 1, "min": 1}),
+                "anchor": (cls.ANCHORS, {"default": "center"}),
+                # crop window position for anchor=offset: 0 = left/top, 1 = right/bottom
+                "offset_x": ("FLOAT", {"default": 0.5, "min": 0.0, "max": 1.0, "step": 0.01}),
+                "offset_y": ("FLOAT", {"default": 0.5, "min": 0.0, "max": 1.0, "step": 0.01}),
+                # 0 x 0 → crop only; one side 0 → derived from the aspect ratio
+                "resize_width": ("INT", {"default": 0, "min": 0}),
+                "resize_height": ("INT", {"default": 0, "min": 0}),
+                "resize_mode": (RESIZE_MODES, {"default": "bilinear"}),
+            },
+            "optional": {
+                "max_chunk_mb": ("INT", {"default": 1024, "min": 0}),
+            }
+        }
+
+    RETURN_TYPES = ("IMAGE", "INT", "INT")
+    RETURN_NAMES = ("image", "width", "height")
+    FUNCTION = "crop_resize"
+    CATEGORY = "Stalkervr/Images"
+
+    SALIENCY_SIZE = 64
+
+    def _saliency_centers(self, image):
+        """[B, 2] (x, y) center of gradient energy per image, in 0..1, from a small area-downscaled copy."""
+        _, h, w, _ = image.shape
+        scale = self.SALIENCY_SIZE / max(h, w)
+        size = (max(2, round(h * scale)), max(2, round(w * scale)))
+        small = F.interpolate(image.permute(0, 3, 1, 2), size=size, mode="area").mean(dim=1)  # [B, sh, sw]
+
+        energy = (small[:, 1:, 1:] - small[:, :-1, 1:]).abs() + (small[:, 1:, 1:] - small[:, 1:, :-1]).abs()
+        total = energy.sum(dim=(1, 2)).clamp(min=1e-8)
+        ys = (torch.arange(energy.shape[1], device=image.device, dtype=energy.dtype) + 1) / size[0]
+        xs = (torch.arange(energy.shape[2], device=image.device, dtype=energy.dtype) + 1) / size[1]
+        cx = (energy.sum(dim=1) * xs).sum(dim=1) / total
+        cy = (energy.sum(dim=2) * ys).sum(dim=1) / total
+        # flat images have no energy → keep them centered
+        flat = energy.sum(dim=(1, 2)) <= 1e-8
+        cx = torch.where(flat, torch.full_like(cx, 0.5), cx)
+        cy = torch.where(flat, torch.full_like(cy, 0.5), cy)
+        return torch.stack([cx, cy], dim=1)
+
+    def crop_resize(
+        self,
+        image,
+        aspect_ratio,
+        custom_x,
+        custom_y,
+        anchor,
+        offset_x,
+        offset_y,
+        resize_width,
+        resize_height,
+        resize_mode,
+        max_chunk_mb=1024,
+    ):
+        _, target_w, target_h = self.calculate(image, aspect_ratio, custom_x, custom_y)
+        b, h, w, _ = image.shape
+        target_w = max(1, min(target_w, w))
+        target_h = max(1, min(target_h, h))
+        if resize_width and resize_height:
+            out_w, out_h = resize_width, resize_height
+        elif resize_width:
+            out_w, out_h = resize_width, max(1, round(resize_width * target_h / target_w))
+        elif resize_height:
+            out_w, out_h = max(1, round(resize_height * target_w / target_h)), resize_height
+        else:
+            out_w, out_h = target_w, target_h
+
+        if anchor == "saliency":
+            # every image gets its own window → gather all crops in one batched op
+            # (windows lie inside the image, so nothing is padded), then resize as below
+            centers = self._saliency_centers(image)
+            x0 = (centers[:, 0] * w - target_w / 2).round().clamp(0, w - target_w).long()
+            y0 = (centers[:, 1] * h - target_h / 2).round().clamp(0, h - target_h).long()
+            boxes = torch.stack([x0, y0, x0 + target_w, y0 + target_h], dim=1)
+            fill = image.new_zeros((b, image.shape[3]))
+            cropped = _pad_boxes(image, boxes, target_h, target_w, fill)
+        else:
+            fx, fy = (0.5, 0.5) if anchor == "center" else (offset_x, offset_y)
+            x0 = round((w - target_w) * fx)
+            y0 = round((h - target_h) * fy)
+            # a view; _resize_nhwc copies it slice by slice only when resizing
+            cropped = image[:, y0:y0 + target_h, x0:x0 + target_w, :]
+
+        if (out_w, out_h) == (target_w, target_h):
+            return (cropped, out_w, out_h)
+        return (_resize_nhwc(cropped, out_h, out_w, resize_mode, max_chunk_mb * 1024 * 1024), out_w, out_h)
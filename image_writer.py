@@ -0,0 +1,135 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+from PIL import Image
+
+
+SAVE_FORMATS = ["png", "webp", "jpeg"]
+
+
+def to_uint8(images: torch.Tensor) -> np.ndarray:
+    """
+    Convert a whole [B, H, W, C] float batch (0..1) to uint8 in one tensor op,
+    with rounding and clamping. Slices along B of the result are contiguous.
+    """
+    converted = (images.detach() * 255).round_().clamp_(0, 255).to(torch.uint8)
+    return converted.cpu().numpy()
+
+
+def encoder_options(image_format="png", compress_level=6, quality=95, lossless=False):
+    """Returns (file extension, PIL save kwargs) for the chosen output format."""
+    if image_format == "png":
+        return "png", {"format": "PNG", "compress_level": compress_level}
+    if image_format == "webp":
+        return "webp", {"format": "WEBP", "quality": quality, "lossless": lossless, "method": 4}
+    if image_format == "jpeg":
+        return "jpg", {"format": "JPEG", "quality": quality}
+    raise ValueError(f"Unsupported image format '{image_format}', expected one of {SAVE_FORMATS}")
+
+
+def to_pil(image) -> Image.Image:
+    """[H, W, C] float tensor (0..1) or uint8 array → PIL image (L / RGB / RGBA)."""
+    if isinstance(image, torch.Tensor):
+        image = (image.detach().cpu().numpy() * 255).astype(np.uint8)
+
+    c = image.shape[2]
+    if c == 1:
+        return Image.fromarray(image[:, :, 0], mode="L")
+    elif c == 3:
+        return Image.fromarray(image, mode="RGB")
+    elif c == 4:
+        return Image.fromarray(image, mode="RGBA")
+    raise ValueError(f"Unsupported channel count: expected 1, 3 or 4 but got {c}")
+
+
+class ImageWriter:
+    """
+    Shared background image writer for the cropping nodes.
+
+    Encoding and writing happen on a thread pool (PIL releases the GIL while
+    compressing), so nodes can return their outputs immediately. At most
+    `max_pending` images are queued; submit() blocks when the queue is full,
+    which bounds the memory held by pending tiles. Failures are collected and
+    handed back to the next caller via pop_errors() / flush().
+    """
+
+    def __init__(self, workers=None, max_pending=64):
+        self.workers = workers or min(8, os.cpu_count() or 1)
+        self.max_pending = max_pending
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._errors = []
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ImageWriter")
+            return self._executor
+
+    def submit(self, path, image, **save_kwargs):
+        """Queues `image` to be saved at `path`. Blocks while max_pending writes are in flight."""
+        executor = self._get_executor()
+        self._slots.acquire()
+        try:
+            future = executor.submit(self._write, path, image, save_kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    @staticmethod
+    def _write(path, image, save_kwargs):
+        try:
+            pil_img = to_pil(image)
+            if save_kwargs.get("format") == "JPEG" and pil_img.mode == "RGBA":
+                pil_img = pil_img.convert("RGB")
+            pil_img.save(path, **save_kwargs)
+        except Exception as e:
+            raise RuntimeError(f"'{path}': {e}") from e
+        return path
+
+    def _done(self, future):
+        with self._lock:
+            self._pending.discard(future)
+            error = future.exception()
+            if error is not None:
+                self._errors.append(error)
+        self._slots.release()
+
+    def pending(self):
+        with self._lock:
+            return len(self._pending)
+
+    def pop_errors(self):
+        with self._lock:
+            errors, self._errors = self._errors, []
+        return errors
+
+    def flush(self, timeout=None):
+        """Waits for every queued write and returns the errors collected so far."""
+        with self._lock:
+            pending = list(self._pending)
+        for future in pending:
+            try:
+                future.result(timeout=timeout)
+            except Exception:
+                pass  # collected by _done
+        return self.pop_errors()
+
+
+IMAGE_WRITER = ImageWriter()
+
+
+@atexit.register
+def _flush_on_exit():
+    for error in IMAGE_WRITER.flush():
+        print(f"[ImageWriter] Save failed: {error}")
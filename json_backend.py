@@ -0,0 +1,175 @@
+"""
+JSON serialization layer for every node and HTTP handler of this package.
+
+orjson is used when it is installed, the stdlib json module otherwise. The
+results are interchangeable with the stdlib calls they replace:
+
+    loads(s)                    json.loads(s)  (str or bytes)
+    dumps(obj)                  json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    dumps(obj, indent=2)        json.dumps(obj, ensure_ascii=False, indent=2)
+    dumps(obj, indent=4)        stdlib (orjson only knows 2-space indentation)
+    dumps(obj, ensure_ascii=True)  stdlib
+
+Anything orjson rejects but the stdlib accepts (NaN/Infinity literals,
+integers beyond 64 bits, ...) transparently falls back to the stdlib, so only
+the speed depends on the backend. orjson would write NaN / Infinity floats as
+null, so documents containing them are serialized by the stdlib as well (the
+check only runs when orjson's output contains a null). The one remaining
+difference in the output text: orjson spells exponents without padding
+(1e16 / 1e-7 instead of 1e+16 / 1e-07), which parses to the same values.
+
+Set STALKERVR_JSON_BACKEND=json to force the stdlib.
+
+Benchmark:
+    python json_backend.py benchmark [--size-mb 8] [--repeat 5]
+"""
+import argparse
+import json
+import math
+import os
+import time
+
+try:
+    if os.environ.get("STALKERVR_JSON_BACKEND", "").lower() in ("json", "stdlib"):
+        raise ImportError("stdlib backend forced")
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+# orjson.JSONDecodeError subclasses it, so callers can keep catching this one
+JSONDecodeError = json.JSONDecodeError
+
+
+def _stdlib_dumps(obj, indent, ensure_ascii):
+    if indent is None:
+        return json.dumps(obj, ensure_ascii=ensure_ascii, separators=(",", ":"))
+    return json.dumps(obj, ensure_ascii=ensure_ascii, indent=indent)
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+    _INDENT_OPTIONS = _OPTIONS | orjson.OPT_INDENT_2
+
+    def loads(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # stdlib extensions (NaN, Infinity, ...) or a real error → let json decide
+            return json.loads(data)
+
+    _SKIP_TYPES = frozenset((str, int, bool, type(None)))
+
+    def _has_non_finite(obj, isfinite=math.isfinite):
+        """True if obj contains a NaN / Infinity float."""
+        if isinstance(obj, dict):
+            obj = obj.values()
+        elif not isinstance(obj, (list, tuple)):
+            return isinstance(obj, float) and not isfinite(obj)
+        for value in obj:
+            t = type(value)
+            if t is float:
+                if not isfinite(value):
+                    return True
+            elif t not in _SKIP_TYPES and _has_non_finite(value):
+                return True
+        return False
+
+    def dumps_bytes(obj, indent=None, ensure_ascii=False):
+        if not ensure_ascii and indent in (None, 2):
+            try:
+                data = orjson.dumps(obj, option=_INDENT_OPTIONS if indent else _OPTIONS)
+            except (orjson.JSONEncodeError, TypeError):
+                pass
+            else:
+                # NaN / Infinity came out as null → let the stdlib write them like it always did
+                if b"null" not in data or not _has_non_finite(obj):
+                    return data
+        return _stdlib_dumps(obj, indent, ensure_ascii).encode("utf-8")
+
+    def dumps(obj, indent=None, ensure_ascii=False):
+        return dumps_bytes(obj, indent, ensure_ascii).decode("utf-8")
+
+else:
+    def loads(data):
+        return json.loads(data)
+
+    def dumps(obj, indent=None, ensure_ascii=False):
+        return _stdlib_dumps(obj, indent, ensure_ascii)
+
+    def dumps_bytes(obj, indent=None, ensure_ascii=False):
+        return dumps(obj, indent, ensure_ascii).encode("utf-8")
+
+
+def load(path):
+    """Parses a JSON file."""
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+# --- benchmark ---
+
+def _sample_document(size_mb):
+    """Prompt-library like document: records with nested objects, lists and unicode text."""
+    record = {
+        "name": "Харли Квинн",
+        "age": 25,
+        "power": 9.5,
+        "info": {"city": "Gotham", "zip": "10001", "coords": [40.7128, -74.006]},
+        "tags": ["psycho", "funny", "dangerous"],
+        "description": "cinematic portrait, dramatic lighting, 35mm, " * 4,
+        "enabled": True,
+        "extra": None,
+    }
+    record_size = len(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+    count = max(1, int(size_mb * 1024 * 1024 / record_size))
+    return {"items": [dict(record, id=i) for i in range(count)]}
+
+
+def _best_of(repeat, func):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def benchmark(size_mb=8, repeat=5):
+    doc = _sample_document(size_mb)
+    text = json.dumps(doc, ensure_ascii=False)
+    mb = len(text.encode("utf-8")) / (1024 * 1024)
+
+    cases = [
+        ("loads", lambda: json.loads(text), lambda: loads(text)),
+        ("dumps compact", lambda: json.dumps(doc, ensure_ascii=False, separators=(",", ":")), lambda: dumps(doc)),
+        ("dumps indent=2", lambda: json.dumps(doc, ensure_ascii=False, indent=2), lambda: dumps(doc, indent=2)),
+    ]
+    print(f"[JsonBackend] backend={BACKEND}, document {mb:.1f} MB, best of {repeat}")
+    results = {}
+    for name, stdlib_call, backend_call in cases:
+        stdlib_time = _best_of(repeat, stdlib_call)
+        backend_time = _best_of(repeat, backend_call)
+        results[name] = (stdlib_time, backend_time)
+        print(
+            f"  {name:<15} json {stdlib_time * 1000:8.1f} ms   {BACKEND} {backend_time * 1000:8.1f} ms"
+            f"   x{stdlib_time / backend_time:.1f}   ({mb / backend_time:.0f} MB/s)"
+        )
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON backend tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("benchmark", help="compare parse/serialize speed with the stdlib")
+    bench.add_argument("--size-mb", type=float, default=8)
+    bench.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == "benchmark":
+        benchmark(args.size_mb, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Bounded cache of parsed JSON documents shared by the JSON nodes.
+
+The same (often large) JSON string usually feeds several nodes; each of them
+used to json.loads() the full text again. Documents are keyed by a hash of the
+text and evicted least-recently-used once their estimated memory exceeds
+max_bytes. Parsed objects are several times larger than their text, so the
+estimate is text bytes * PARSED_SIZE_FACTOR (measured with tracemalloc:
+~1.5x for string-heavy documents, 3-4x for typical records, ~4.7x for number arrays).
+
+Cached documents are shared: callers must treat them as read-only (the
+mutating nodes use JsonPath.with_value() / without(), which copy only the
+containers on the changed path).
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from .json_backend import loads
+
+PARSED_SIZE_FACTOR = 5
+
+
+class ParsedDocumentCache:
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, max_entries=256):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._docs = OrderedDict()  # key → (document, size)
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(text):
+        data = text.encode("utf-8", "surrogatepass")
+        # length is part of the key so a hash collision would also need equal sizes
+        return len(data), hashlib.blake2b(data, digest_size=16).digest()
+
+    def loads(self, text):
+        """json.loads(text), served from the cache when the same text was parsed before."""
+        if not isinstance(text, str):
+            return loads(text)
+
+        key = self._key(text)
+        with self._lock:
+            cached = self._docs.get(key)
+            if cached is not None:
+                self._docs.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+
+        # parse outside the lock; invalid JSON raises and is never cached
+        doc = loads(text)
+        size = key[0] * PARSED_SIZE_FACTOR
+        if size > self.max_bytes or not isinstance(doc, (dict, list)):
+            # too big to keep, or a scalar that is cheap to parse again
+            return doc
+
+        with self._lock:
+            if key not in self._docs:
+                self._docs[key] = (doc, size)
+                self._bytes += size
+                self._evict()
+            else:
+                doc = self._docs[key][0]
+        return doc
+
+    def _evict(self):
+        while self._docs and (self._bytes > self.max_bytes or len(self._docs) > self.max_entries):
+            _, (_, size) = self._docs.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._docs.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._docs),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+DOCUMENT_CACHE = ParsedDocumentCache()
@@ -0,0 +1,222 @@
+"""
+Batch JSON patching: a list of operations applied in one parse/serialize cycle.
+
+Two input forms are accepted:
+
+1) RFC 6902 JSON Patch (a JSON array), paths are JSON Pointers:
+       [{"op": "replace", "path": "/action/value", "value": 999},
+        {"op": "remove", "path": "/action/props"},
+        {"op": "add", "path": "/tags/-", "value": "new"}]
+   Supported ops: add, remove, replace, move, copy, test.
+   The patch is atomic: the first failing operation aborts it.
+
+2) One operation per line with the dotted paths of the other JSON nodes:
+       set action.value = 999
+       remove action.props | action.sequence
+       append tags = new
+   Values are JSON when they parse as such ({...}, [...], "text"), otherwise
+   they are cast like JSON Field Add & Replace (true/false/null/int/float/string).
+   Removing a missing path is not an error (same as JSON Field Remover).
+
+Operations are applied copy-on-write (see JsonPath.with_value / without), so
+the input document - possibly shared through the document cache - is never modified.
+"""
+from .json_backend import dumps as _dumps, loads
+from .json_path import JsonPathError, compile_path, compile_pointer, split_paths
+
+LINE_OPS = ("set", "remove", "append")
+RFC_OPS = ("add", "remove", "replace", "move", "copy", "test")
+
+_ABSENT = object()
+
+
+class PatchError(ValueError):
+    pass
+
+
+def cast_value(value: str):
+    """String from a widget → bool / None / int / float, or the string itself."""
+    v = value.strip()
+    v_low = v.lower()
+
+    if v_low == "true":
+        return True
+    if v_low == "false":
+        return False
+    if v_low == "null":
+        return None
+
+    # integer?
+    if (v.startswith("-") and v[1:].isdigit()) or v.isdigit():
+        try:
+            return int(v)
+        except ValueError:
+            pass
+
+    # float?
+    try:
+        return float(v)
+    except ValueError:
+        pass
+
+    return value
+
+
+def _line_value(text):
+    text = text.strip()
+    if text[:1] in ('{', '[', '"'):
+        try:
+            return loads(text)
+        except ValueError:
+            pass
+    return cast_value(text)
+
+
+def _parse_lines(text):
+    operations = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        op, _, rest = line.partition(" ")
+        op = op.lower()
+        if op not in LINE_OPS:
+            raise PatchError(f"line {number}: unknown operation '{op}', expected one of {LINE_OPS}")
+
+        if op == "remove":
+            for path in split_paths(rest):
+                operations.append({"op": "remove", "path": compile_path(path), "strict": False})
+            continue
+
+        path, eq, value = rest.partition("=")
+        if not eq or not path.strip():
+            raise PatchError(f"line {number}: expected '{op} <path> = <value>'")
+        operations.append({"op": op, "path": compile_path(path), "value": _line_value(value)})
+    return operations
+
+
+def _parse_rfc(items):
+    operations = []
+    for number, item in enumerate(items):
+        if not isinstance(item, dict) or item.get("op") not in RFC_OPS or "path" not in item:
+            raise PatchError(f"operation #{number}: expected {{'op': one of {RFC_OPS}, 'path': ...}}")
+        op = dict(item)
+        pointer = op["path"]
+        if not isinstance(pointer, str) or not isinstance(op.get("from", ""), str):
+            raise PatchError(f"operation #{number}: 'path' and 'from' must be JSON Pointer strings")
+        op["append"] = pointer.endswith("/-")
+        op["path"] = compile_pointer(pointer)
+        if "from" in op:
+            op["from"] = compile_pointer(op["from"])
+        elif op["op"] in ("move", "copy"):
+            raise PatchError(f"operation #{number}: '{op['op']}' needs 'from'")
+        if op["op"] in ("add", "replace", "test") and "value" not in op:
+            raise PatchError(f"operation #{number}: '{op['op']}' needs 'value'")
+        op["strict"] = True
+        operations.append(op)
+    return operations
+
+
+def parse_operations(text):
+    """Patch text (RFC 6902 JSON array or line syntax) → list of compiled operations."""
+    if text.lstrip().startswith("["):
+        try:
+            items = loads(text)
+        except ValueError as e:
+            raise PatchError(f"invalid JSON Patch: {e}") from e
+        return _parse_rfc(items)
+    return _parse_lines(text)
+
+
+def _json_equal(a, b):
+    """RFC 6902 'test' equality: like ==, but true/false never equal the numbers 1/0."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(v, b[k]) for k, v in a.items())
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    return type(a) is type(b) and a == b
+
+
+def _insert(doc, path, value, append):
+    """RFC 'add': inserts into arrays, sets object members."""
+    if not path.segments:
+        return value
+    parent_path = path.parent()
+    parent = parent_path.get(doc, None)
+    if isinstance(parent, list):
+        if append:
+            index = len(parent)
+        else:
+            index = getattr(path.segments[-1], "index", None)
+            if index is None or not 0 <= index <= len(parent):
+                raise PatchError(f"'{path.path}': array index out of range")
+        items = list(parent)
+        items.insert(index, value)
+        return parent_path.with_value(doc, items)
+    if not isinstance(parent, dict):
+        raise PatchError(f"'{path.path}': parent is not an object or array")
+    return path.with_value(doc, value)
+
+
+def _apply(doc, op):
+    name = op["op"]
+    path = op["path"]
+
+    if name == "set":
+        return path.with_value(doc, op["value"])
+
+    if name == "append":
+        current = path.get(doc, None)
+        if current is None:
+            items = [op["value"]]
+        elif isinstance(current, list):
+            items = current + [op["value"]]
+        else:
+            raise PatchError(f"'{path.path}': cannot append to {type(current).__name__}")
+        return path.with_value(doc, items)
+
+    if name == "remove":
+        doc, removed = path.without(doc)
+        if not removed and op["strict"]:
+            raise PatchError(f"'{path.path}': nothing to remove")
+        return doc
+
+    if name == "add":
+        return _insert(doc, path, op["value"], op["append"])
+
+    if name == "replace":
+        if path.get(doc, _ABSENT) is _ABSENT:
+            raise PatchError(f"'{path.path}': nothing to replace")
+        return path.with_value(doc, op["value"])
+
+    if name == "test":
+        current = path.get(doc, _ABSENT)
+        if current is _ABSENT or not _json_equal(current, op["value"]):
+            raise PatchError(f"'{path.path}': test failed")
+        return doc
+
+    # move / copy
+    value = op["from"].get(doc, _ABSENT)
+    if value is _ABSENT:
+        raise PatchError(f"'{op['from'].path}': nothing to {name}")
+    if name == "move":
+        doc, _ = op["from"].without(doc)
+    return _insert(doc, path, value, op["append"])
+
+
+def apply_patch(doc, operations):
+    """Applies compiled operations in order. Returns the new document; doc itself is untouched."""
+    for number, op in enumerate(operations, 1):
+        try:
+            doc = _apply(doc, op)
+        except (JsonPathError, PatchError) as e:
+            raise PatchError(f"operation {number} ({op['op']}): {e}") from e
+    return doc
+
+
+def dumps(data, compact=False, indent=4):
+    return _dumps(data) if compact else _dumps(data, indent=indent)
@@ -0,0 +1,429 @@
+"""
+Shared JSON path engine for the JSON nodes.
+
+Path syntax:
+    info.city            nested keys
+    items.1.name         number → list index (or the key "1" in an object)
+    items[1].name        same, bracket form; negative indices count from the end
+    items.*.name         wildcard: every key / item
+    "a.b".c  or  ["a.b"] quoted keys (may contain dots, brackets, quotes with \\ escape)
+    $.a.b                optional leading root marker
+
+Paths are compiled once (LRU cached) into JsonPath objects that can be applied
+to any number of documents.
+"""
+from functools import lru_cache
+
+
+class JsonPathError(ValueError):
+    pass
+
+
+_MISSING = object()
+
+
+class _Key:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def children(self, node):
+        if isinstance(node, dict) and self.name in node:
+            yield node[self.name]
+
+    def slot(self, node, create):
+        """Key to follow in `node` (None if missing and not creating)."""
+        if isinstance(node, dict):
+            return self.name if create or self.name in node else None
+        if create:
+            raise JsonPathError(f"cannot set key '{self.name}' on {type(node).__name__}")
+        return None
+
+    def child_for_write(self, node):
+        if not isinstance(node, dict):
+            raise JsonPathError(f"cannot set key '{self.name}' on {type(node).__name__}")
+        value = node.get(self.name)
+        if not isinstance(value, (dict, list)):
+            value = node[self.name] = {}
+        return value
+
+    def assign(self, node, value):
+        if not isinstance(node, dict):
+            raise JsonPathError(f"cannot set key '{self.name}' on {type(node).__name__}")
+        node[self.name] = value
+
+    def delete(self, node):
+        if isinstance(node, dict) and self.name in node:
+            del node[self.name]
+            return 1
+        return 0
+
+    def __repr__(self):
+        return f"Key({self.name!r})"
+
+
+class _Index:
+    """Number segment: list index, or the equivalent string key on objects."""
+    __slots__ = ("index", "key")
+
+    def __init__(self, index, key):
+        self.index = index
+        self.key = key
+
+    def _in_range(self, node):
+        return -len(node) <= self.index < len(node)
+
+    def children(self, node):
+        if isinstance(node, list):
+            if self._in_range(node):
+                yield node[self.index]
+        elif isinstance(node, dict) and self.key in node:
+            yield node[self.key]
+
+    def slot(self, node, create):
+        if isinstance(node, dict):
+            return _Key(self.key).slot(node, create)
+        if isinstance(node, list):
+            if self._in_range(node):
+                return self.index % len(node)
+            if create:
+                if self.index < 0:
+                    raise JsonPathError(f"index {self.index} out of range")
+                return self.index
+            return None
+        if create:
+            raise JsonPathError("trying to index non-array object")
+        return None
+
+    def child_for_write(self, node):
+        if isinstance(node, dict):
+            return _Key(self.key).child_for_write(node)
+        if not isinstance(node, list):
+            raise JsonPathError("trying to index non-array object")
+        if not self._in_range(node):
+            if self.index < 0:
+                raise JsonPathError(f"index {self.index} out of range")
+            # extend the array if needed
+            while len(node) <= self.index:
+                node.append({})
+        value = node[self.index]
+        if not isinstance(value, (dict, list)):
+            value = node[self.index] = {}
+        return value
+
+    def assign(self, node, value):
+        if isinstance(node, dict):
+            node[self.key] = value
+            return
+        if not isinstance(node, list):
+            raise JsonPathError("trying to index non-array object")
+        if self.index < 0 and not self._in_range(node):
+            raise JsonPathError(f"index {self.index} out of range")
+        while len(node) <= self.index:
+            node.append({})
+        node[self.index] = value
+
+    def delete(self, node):
+        if isinstance(node, list):
+            if self._in_range(node):
+                del node[self.index]
+                return 1
+            return 0
+        return _Key(self.key).delete(node)
+
+    def __repr__(self):
+        return f"Index({self.index})"
+
+
+class _Wildcard:
+    __slots__ = ()
+
+    def children(self, node):
+        if isinstance(node, dict):
+            yield from node.values()
+        elif isinstance(node, list):
+            yield from node
+
+    def assign(self, node, value):
+        if isinstance(node, dict):
+            for key in node:
+                node[key] = value
+        elif isinstance(node, list):
+            node[:] = [value] * len(node)
+
+    def delete(self, node):
+        if isinstance(node, (dict, list)):
+            count = len(node)
+            node.clear()
+            return count
+        return 0
+
+    def __repr__(self):
+        return "Wildcard"
+
+
+_WILDCARD = _Wildcard()
+
+
+def _number_segment(text):
+    body = text[1:] if text.startswith("-") else text
+    if body.isdigit():
+        return _Index(int(text), text)
+    return None
+
+
+def _parse(path):
+    segments = []
+    i = 0
+    n = len(path)
+
+    if path == "$" or path.startswith(("$.", "$[")):
+        i = 2 if path.startswith("$.") else 1
+
+    def read_quoted(i):
+        quote = path[i]
+        i += 1
+        chars = []
+        while i < n:
+            ch = path[i]
+            if ch == "\\" and i + 1 < n:
+                chars.append(path[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                return "".join(chars), i + 1
+            chars.append(ch)
+            i += 1
+        raise JsonPathError(f"unterminated quote in path '{path}'")
+
+    expect_segment = True
+    while i < n:
+        ch = path[i]
+        if ch == "[":
+            end = i + 1
+            if end < n and path[end] in "\"'":
+                key, end = read_quoted(end)
+                segments.append(_Key(key))
+            else:
+                close = path.find("]", end)
+                if close == -1:
+                    raise JsonPathError(f"missing ']' in path '{path}'")
+                inner = path[end:close].strip()
+                end = close
+                if inner == "*":
+                    segments.append(_WILDCARD)
+                else:
+                    segment = _number_segment(inner)
+                    if segment is None:
+                        raise JsonPathError(f"invalid index '[{inner}]' in path '{path}'")
+                    segments.append(segment)
+            if end >= n or path[end] != "]":
+                raise JsonPathError(f"missing ']' in path '{path}'")
+            i = end + 1
+            expect_segment = False
+        elif ch == ".":
+            if expect_segment:
+                raise JsonPathError(f"empty segment in path '{path}'")
+            i += 1
+            expect_segment = True
+        elif ch in "\"'" and expect_segment:
+            key, i = read_quoted(i)
+            segments.append(_Key(key))
+            expect_segment = False
+        else:
+            if not expect_segment:
+                raise JsonPathError(f"unexpected '{ch}' in path '{path}'")
+            end = i
+            while end < n and path[end] not in ".[":
+                end += 1
+            text = path[i:end]
+            if text == "*":
+                segments.append(_WILDCARD)
+            else:
+                segments.append(_number_segment(text) or _Key(text))
+            i = end
+            expect_segment = False
+
+    if expect_segment and segments:
+        raise JsonPathError(f"path '{path}' ends with '.'")
+    return tuple(segments)
+
+
+class JsonPath:
+    """A compiled path. Use compile_path() to get (cached) instances."""
+    __slots__ = ("path", "segments", "is_multi")
+
+    def __init__(self, path, segments=None):
+        self.path = path
+        self.segments = _parse(path) if segments is None else tuple(segments)
+        self.is_multi = any(s is _WILDCARD for s in self.segments)
+
+    def parent(self):
+        """Path of the container the last segment applies to."""
+        return JsonPath(self.path, self.segments[:-1])
+
+    def find(self, doc):
+        """All values matching the path (empty list if nothing matches)."""
+        current = [doc]
+        for segment in self.segments:
+            current = [child for node in current for child in segment.children(node)]
+            if not current:
+                break
+        return current
+
+    def get(self, doc, default=_MISSING):
+        """
+        Value at the path; for wildcard paths the list of all matches.
+        Raises KeyError when nothing matches and no default is given.
+        """
+        matches = self.find(doc)
+        if self.is_multi:
+            if matches or default is _MISSING:
+                return matches
+            return default
+        if matches:
+            return matches[0]
+        if default is _MISSING:
+            raise KeyError(self.path)
+        return default
+
+    def _parents(self, doc, create):
+        """Containers the last segment applies to; with create=True missing objects are made."""
+        parents = [doc]
+        for segment in self.segments[:-1]:
+            if create and segment is not _WILDCARD:
+                parents = [segment.child_for_write(node) for node in parents]
+            else:
+                # wildcards only expand over existing values
+                parents = [child for node in parents for child in segment.children(node)]
+            if not parents:
+                break
+        return parents
+
+    def set(self, doc, value):
+        """
+        Sets the value, creating missing objects (and extending arrays) on the way.
+        Returns the document (a new value when the path is the root).
+        """
+        if not self.segments:
+            return value
+        last = self.segments[-1]
+        for parent in self._parents(doc, create=True):
+            last.assign(parent, value)
+        return doc
+
+    def remove(self, doc):
+        """Removes every match. Returns the number of removed values."""
+        if not self.segments:
+            return 0
+        last = self.segments[-1]
+        removed = 0
+        for parent in self._parents(doc, create=False):
+            removed += last.delete(parent)
+        return removed
+
+    # --- copy-on-write variants: the input document is never modified ---
+
+    def with_value(self, doc, value):
+        """Like set(), but returns a new document; only containers on the path are copied."""
+        if not self.segments:
+            return value
+        new_doc, _ = _cow_update(doc, self.segments, lambda seg, node: seg.assign(node, value) or 1, True)
+        return new_doc
+
+    def without(self, doc):
+        """Like remove(), but returns (new document, removed count); unrelated subtrees are shared."""
+        if not self.segments:
+            return doc, 0
+        return _cow_update(doc, self.segments, lambda seg, node: seg.delete(node), False)
+
+    def __repr__(self):
+        return f"JsonPath({self.path!r})"
+
+
+def _shallow_copy(node):
+    if isinstance(node, dict):
+        return dict(node)
+    if isinstance(node, list):
+        return list(node)
+    return node
+
+
+def _cow_update(node, segments, leaf_op, create):
+    """
+    Applies leaf_op(last_segment, container) below `node` by path copying:
+    every container on the way to a change is shallow-copied, everything else is
+    shared with the original. Returns (new node, number of changes).
+    """
+    segment, rest = segments[0], segments[1:]
+
+    if not rest:
+        if not isinstance(node, (dict, list)):
+            if create:
+                segment.assign(node, None)  # raises the proper path error
+            return node, 0
+        copy = _shallow_copy(node)
+        changed = leaf_op(segment, copy)
+        return (copy, changed) if changed else (node, 0)
+
+    if segment is _WILDCARD:
+        if isinstance(node, dict):
+            slots = list(node)
+        elif isinstance(node, list):
+            slots = range(len(node))
+        else:
+            slots = ()
+    else:
+        slot = segment.slot(node, create)
+        slots = () if slot is None else (slot,)
+
+    new_node = None
+    total = 0
+    for slot in slots:
+        exists = slot in node if isinstance(node, dict) else slot < len(node)
+        child = node[slot] if exists else _MISSING
+        if create and segment is not _WILDCARD and not isinstance(child, (dict, list)):
+            child = {}
+        elif child is _MISSING:
+            continue
+
+        new_child, changed = _cow_update(child, rest, leaf_op, create)
+        if not changed and exists and new_child is node[slot]:
+            continue
+        if new_node is None:
+            new_node = _shallow_copy(node)
+        if isinstance(new_node, list):
+            while len(new_node) <= slot:
+                new_node.append({})
+        new_node[slot] = new_child
+        total += changed
+
+    return (new_node, total) if new_node is not None else (node, 0)
+
+
+@lru_cache(maxsize=1024)
+def compile_path(path):
+    return JsonPath(path.strip())
+
+
+@lru_cache(maxsize=1024)
+def compile_pointer(pointer):
+    """RFC 6901 JSON Pointer ("/items/0/name", "" = root) → JsonPath."""
+    if pointer == "":
+        return JsonPath(pointer, ())
+    if not pointer.startswith("/"):
+        raise JsonPathError(f"JSON pointer must start with '/': '{pointer}'")
+    segments = []
+    for token in pointer[1:].split("/"):
+        token = token.replace("~1", "/").replace("~0", "~")
+        if token.isdigit() and (token == "0" or not token.startswith("0")):
+            segments.append(_Index(int(token), token))
+        else:
+            segments.append(_Key(token))
+    return JsonPath(pointer, segments)
+
+
+def split_paths(text, separator="|"):
+    """'a.b | c.d' → ['a.b', 'c.d'] (blank entries skipped)."""
+    return [p.strip() for p in text.split(separator) if p.strip()]
@@ -1,4 +1,37 @@
-import json
+import copy
+
+from .json_backend import JSONDecodeError, dumps as _json_dumps
+from .json_cache import DOCUMENT_CACHE
+from .json_patch import PatchError, apply_patch, cast_value, dumps, parse_operations
+from .json_path import JsonPathError, compile_path, split_paths
+from .json_stream import extract_lazy, is_jsonl_file, iter_jsonl, jsonl_file_key
+
+PARSE_MODES = ["full", "lazy"]
+
+_MISSING_VALUE = object()
+
+
+def _scalar_outputs(value):
+    """value → (STRING, INT, FLOAT) representations."""
+    try:
+        int_value = int(float(value))
+    except (ValueError, TypeError, OverflowError):
+        int_value = 0
+
+    try:
+        float_value = float(value)
+    except (ValueError, TypeError):
+        float_value = 0.0
+
+    return str(value), int_value, float_value
+
+
+def _dumps_or_empty(value, indent=2):
+    try:
+        return _json_dumps(value, indent=indent)
+    except Exception:
+        return "{}"
+
 
 class JsonFieldValueExtractor:
     """
@@ -22,6 +55,12 @@ class JsonFieldValueExtractor:
                                "}"
                 }),
                 "field_name": ("STRING", {"default": "tags", "multiline": False}),
+            },
+            "optional": {
+                # lazy: быстрее только для полей в начале большого документа, поле в конце ≈ полный парсинг
+                "parse_mode": (PARSE_MODES, {"default": "full"}),
+                # False → выход JSON пустой, значение не сериализуется
+                "emit_json": ("BOOLEAN", {"default": True}),
             }
         }
 
@@ -32,52 +71,108 @@ class JsonFieldValueExtractor:
     CATEGORY = "Stalkervr/JSON"
     DESCRIPTION = "Node to extract a field value from a JSON string and convert it to multiple output formats"
 
-    def extract_value(self, json_input, field_name):
+    def extract_value(self, json_input, field_name, parse_mode="full", emit_json=True):
         try:
-            data = json.loads(json_input)
-
-            # Поддержка вложенных ключей, например: "info.city"
-            keys = field_name.split(".")
-            value = data
-            for key in keys:
-                if isinstance(value, dict) and key in value:
-                    value = value[key]
+            # Поддержка вложенных ключей, индексов и масок: "info.city", "tags.0", "items.*.name"
+            try:
+                if parse_mode == "lazy":
+                    value = extract_lazy(json_input, field_name)
                 else:
-                    return (f"[ERROR] Field '{field_name}' not found", 0, 0.0, "{}", [], [])
+                    value = compile_path(field_name).get(DOCUMENT_CACHE.loads(json_input))
+            except KeyError:
+                return (f"[ERROR] Field '{field_name}' not found", 0, 0.0, "{}", [], [])
 
             # --- Приведение типов ---
-            str_value = str(value)
-
-            try:
-                int_value = int(float(value))
-            except (ValueError, TypeError):
-                int_value = 0
-
-            try:
-                float_value = float(value)
-            except (ValueError, TypeError):
-                float_value = 0.0
+            str_value, int_value, float_value = _scalar_outputs(value)
 
             # --- JSON-представление значения ---
-            try:
-                json_value = json.dumps(value, ensure_ascii=False, indent=2)
-            except Exception:
-                json_value = "{}"
+            json_value = _dumps_or_empty(value) if emit_json else ""
 
             # --- Если значение — массив ---
             value_list = []
             batch_any = []
             if isinstance(value, list):
-                value_list = value  # теперь список любых типов
-                batch_any = value
+                # глубокие копии: value и вложенные объекты принадлежат закэшированному документу
+                value_list = copy.deepcopy(value)  # теперь список любых типов
+                batch_any = copy.deepcopy(value)
 
             return (str_value, int_value, float_value, json_value, value_list, batch_any)
 
-        except json.JSONDecodeError as e:
+        except JSONDecodeError as e:
             return (f"[ERROR] Invalid JSON: {e}", 0, 0.0, "{}", [], [])
         except Exception as e:
             return (f"[ERROR] {e}", 0, 0.0, "{}", [], [])
 
+
+class JsonMultiFieldExtractor:
+    """
+    Extracts several fields with a single parse of the JSON input.
+    Paths are separated by new lines or '|', e.g. "name | info.city | tags.*".
+
+    Outputs:
+      VALUES - dict {path: value} of the paths that were found
+      LIST   - values in path order (None for missing paths)
+      JSON   - VALUES serialized (empty when emit_json is off)
+      STRING / INT / FLOAT - one item per path, in path order
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "json_input": ("STRING", {"multiline": False}),
+                "field_names": ("STRING", {"default": "name\nage\ninfo.city", "multiline": True}),
+            },
+            "optional": {
+                "emit_json": ("BOOLEAN", {"default": True}),
+            }
+        }
+
+    RETURN_TYPES = ("DICT", "LIST", "STRING", "STRING", "INT", "FLOAT")
+    RETURN_NAMES = ("VALUES", "LIST", "JSON", "STRING", "INT", "FLOAT")
+    OUTPUT_IS_LIST = (False, False, False, True, True, True)
+    FUNCTION = "extract_values"
+    CATEGORY = "Stalkervr/JSON"
+    DESCRIPTION = "Extract several fields (newline or '|' separated paths) from a JSON string with one parse"
+
+    def extract_values(self, json_input, field_names, emit_json=True):
+        paths = [p for line in field_names.splitlines() for p in split_paths(line)]
+
+        try:
+            data = DOCUMENT_CACHE.loads(json_input)
+        except Exception as e:
+            error = f"[ERROR] Invalid JSON: {e}"
+            return ({}, [], "{}", [error] * len(paths), [0] * len(paths), [0.0] * len(paths))
+
+        values = {}
+        ordered = []
+        strings, ints, floats = [], [], []
+        for path in paths:
+            try:
+                value = compile_path(path).get(data)
+            except (KeyError, JsonPathError) as e:
+                print(f"[JsonMultiFieldExtractor] '{path}' skipped: {'not found' if isinstance(e, KeyError) else e}")
+                ordered.append(None)
+                strings.append("")
+                ints.append(0)
+                floats.append(0.0)
+                continue
+
+            if isinstance(value, (dict, list)):
+                # глубокая копия: вложенные объекты принадлежат закэшированному документу
+                value = copy.deepcopy(value)
+            values[path] = value
+            ordered.append(value)
+            str_value, int_value, float_value = _scalar_outputs(value)
+            strings.append(str_value)
+            ints.append(int_value)
+            floats.append(float_value)
+
+        json_value = _dumps_or_empty(values) if emit_json else ""
+
+        return (values, ordered, json_value, strings, ints, floats)
+
+
 class JsonFieldRemover:
     """
     Removes fields from JSON by paths separated with '|'
@@ -93,6 +188,10 @@ class JsonFieldRemover:
                     "default": "action.props | action.sequence",
                     "multiline": False
                 }),
+            },
+            "optional": {
+                # без отступов, separators=(",", ":") — для передачи между нодами
+                "compact_output": ("BOOLEAN", {"default": False}),
             }
         }
 
@@ -102,46 +201,23 @@ class JsonFieldRemover:
     CATEGORY = "Stalkervr/JSON"
     DESCRIPTION = "Removes fields from JSON by paths separated with '|' Example: action.props | action.sequence"
 
-    #
-    # Helper: removes nested field by dot-path
-    #
-    def _remove_path(self, obj, path: str):
-        parts = path.split(".")
-        current = obj
-
-        for i, part in enumerate(parts):
-            if not isinstance(current, dict):
-                return  # can't go deeper → skip
-            if part not in current:
-                return  # no such field → skip
-
-            if i == len(parts) - 1:
-                # last element → delete
-                del current[part]
-                return
-            else:
-                current = current[part]
-
     #
     # Main function
     #
-    def clean_json(self, json_text, remove_fields):
+    def clean_json(self, json_text, remove_fields, compact_output=False):
         try:
-            data = json.loads(json_text)
+            data = DOCUMENT_CACHE.loads(json_text)
         except Exception:
             return (json_text,)  # return original if JSON invalid
 
-        # parse list of fields
-        field_paths = [
-            f.strip()
-            for f in remove_fields.split("|")
-            if f.strip()
-        ]
-
-        for path in field_paths:
-            self._remove_path(data, path)
+        # parse list of fields (copy-on-write: the cached document stays untouched)
+        for path in split_paths(remove_fields):
+            try:
+                data, _ = compile_path(path).without(data)
+            except JsonPathError as e:
+                print(f"[JsonFieldRemover] Skipping invalid path '{path}': {e}")
 
-        return (json.dumps(data, ensure_ascii=False, indent=2),)
+        return (dumps(data, compact_output, indent=2),)
 
 class JsonFieldReplaceAdvanced:
     """
@@ -241,6 +317,9 @@ class JsonFieldReplaceAdvanced:
                 "json_string": ("STRING", {"multiline": False}),
                 "field_path": ("STRING", {"default": ""}),   # путь: a.b.c или arr.1.name
                 "new_value": ("STRING", {"default": ""}),
+            },
+            "optional": {
+                "compact_output": ("BOOLEAN", {"default": False}),
             }
         }
 
@@ -251,89 +330,173 @@ class JsonFieldReplaceAdvanced:
 
     # --- попытка привести новое значение к bool/int/float/null ---
     def cast_value(self, value: str):
-        v = value.strip()
-        v_low = v.lower()
-
-        if v_low == "true":
-            return True
-        if v_low == "false":
-            return False
-        if v_low == "null":
-            return None
-
-        # integer?
-        if (v.startswith("-") and v[1:].isdigit()) or v.isdigit():
-            try:
-                return int(v)
-            except:
-                pass
-
-        # float?
-        try:
-            return float(v)
-        except:
-            pass
-
-        return value  # оставить строкой
-
-    # --- установка значения по пути ---
-    def set_by_path(self, data, path_parts, value):
-        obj = data
-
-        for i, part in enumerate(path_parts):
-            is_last = i == len(path_parts) - 1
+        return cast_value(value)
 
-            # индекс массива?
-            if part.isdigit():
-                idx = int(part)
-
-                if not isinstance(obj, list):
-                    raise Exception("Path error: trying to index non-array object")
-
-                # расширяем массив если нужно
-                while len(obj) <= idx:
-                    obj.append({})
-
-                if is_last:
-                    obj[idx] = value
-                else:
-                    if not isinstance(obj[idx], (dict, list)):
-                        obj[idx] = {}
-                    obj = obj[idx]
-
-            else:
-                # ключ объекта
-                if is_last:
-                    obj[part] = value
-                else:
-                    if part not in obj or not isinstance(obj[part], (dict, list)):
-                        obj[part] = {}
-                    obj = obj[part]
-
-    def replace_field(self, json_string, field_path, new_value):
+    def replace_field(self, json_string, field_path, new_value, compact_output=False):
         # парсим JSON
         try:
-            data = json.loads(json_string)
+            data = DOCUMENT_CACHE.loads(json_string)
         except Exception as e:
             return (f"JSON parse error: {str(e)}",)
 
         if not field_path:
             # просто вернуть форматированный JSON
-            return (json.dumps(data, ensure_ascii=False, indent=4),)
+            return (dumps(data, compact_output),)
 
         # преобразуем новое значение
         casted = self.cast_value(new_value)
 
-        # путь: a.b.c → ["a","b","c"]
-        path_parts = field_path.split(".")
-
-        # установка
+        # путь: a.b.c / arr.1.name / arr.*.name (см. json_path)
+        # with_value копирует только изменяемую ветку — закэшированный документ не портится
         try:
-            self.set_by_path(data, path_parts, casted)
+            data = compile_path(field_path).with_value(data, casted)
         except Exception as e:
             return (f"Path set error: {str(e)}",)
 
         # ✔ Возвращаем форматированный JSON
-        formatted = json.dumps(data, ensure_ascii=False, indent=4)
+        formatted = dumps(data, compact_output)
 
         return (formatted,)
+
+
+class JsonPatchBatch:
+    """
+    Applies a list of operations to a JSON string in one parse/serialize cycle
+    instead of chaining JSON Field Add & Replace / JSON Field Remover nodes.
+
+    operations - RFC 6902 JSON Patch array:
+                     [{"op": "replace", "path": "/action/value", "value": 999},
+                      {"op": "add", "path": "/tags/-", "value": "new"}]
+                 or one operation per line:
+                     set action.value = 999
+                     remove action.props | action.sequence
+                     append tags = new
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "json_string": ("STRING", {"multiline": False}),
+                "operations": ("STRING", {
+                    "default": "set action.value = 999\nremove action.props | action.sequence",
+                    "multiline": True
+                }),
+                "compact_output": ("BOOLEAN", {"default": False}),
+            }
+        }
+
+    RETURN_TYPES = ("STRING", "INT")
+    RETURN_NAMES = ("json_patched", "applied")
+    FUNCTION = "patch_json"
+    CATEGORY = "Stalkervr/JSON"
+    DESCRIPTION = "Apply set/remove/append operations or an RFC 6902 JSON Patch in one pass"
+
+    def patch_json(self, json_string, operations, compact_output):
+        try:
+            data = DOCUMENT_CACHE.loads(json_string)
+        except Exception as e:
+            return (f"JSON parse error: {str(e)}", 0)
+
+        try:
+            ops = parse_operations(operations)
+            data = apply_patch(data, ops)
+        except (PatchError, JsonPathError) as e:
+            return (f"Patch error: {str(e)}", 0)
+
+        return (dumps(data, compact_output), len(ops))
+
+
+class JsonlBatchProcessor:
+    """
+    Streams JSONL / NDJSON records (text or a .jsonl file path) through the
+    JSON node operations and emits them as a list, at most chunk_size records
+    per run, so memory stays flat however big the file is.
+
+    A graph cannot feed next_start back into start (that would be a cycle), so
+    larger files are walked from outside the graph: queue the workflow once per
+    chunk (e.g. a script posting to ComfyUI's /prompt API) with start set to
+    the previous run's next_start, until done is True. Seeking to the next
+    chunk of a file is O(1), the offset is remembered between runs.
+
+    operations    - optional, same syntax as JSON Batch Patch, applied to every record
+    extract_field - optional path; its value per record goes to the VALUES output
+                    (records without it are skipped there)
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "jsonl_input": ("STRING", {"multiline": True, "default": ""}),
+                "operations": ("STRING", {"multiline": True, "default": ""}),
+                "extract_field": ("STRING", {"default": ""}),
+                "start": ("INT", {"default": 0, "min": 0, "max": 0x7FFFFFFF}),
+                "chunk_size": ("INT", {"default": 1000, "min": 1, "max": 100000}),
+                "compact_output": ("BOOLEAN", {"default": True}),
+            }
+        }
+
+    RETURN_TYPES = ("STRING", "BATCH_ANY", "INT", "BOOLEAN")
+    RETURN_NAMES = ("RECORDS", "VALUES", "next_start", "done")
+    OUTPUT_IS_LIST = (True, True, False, False)
+    FUNCTION = "process"
+    CATEGORY = "Stalkervr/JSON"
+    DESCRIPTION = "Stream a JSONL file or text through patch/extract operations in bounded chunks"
+
+    @classmethod
+    def IS_CHANGED(cls, jsonl_input, **kwargs):
+        # a file path widget does not change when the file is edited or appended to
+        if is_jsonl_file(jsonl_input):
+            try:
+                return jsonl_file_key(jsonl_input)
+            except OSError:
+                return None
+        return ""
+
+    def process(self, jsonl_input, operations, extract_field, start, chunk_size, compact_output):
+        try:
+            ops = parse_operations(operations) if operations.strip() else []
+            path = compile_path(extract_field) if extract_field.strip() else None
+        except (PatchError, JsonPathError) as e:
+            return ([f"[ERROR] {e}"], [], start, True)
+
+        records = []
+        values = []
+        errors = []
+        next_start = start
+        done = True
+
+        stream = iter_jsonl(jsonl_input, start, errors)
+        try:
+            for index, record in stream:
+                if len(records) >= chunk_size:
+                    # peeked one record past the chunk → there is more; resume right here
+                    next_start = index
+                    done = False
+                    break
+                next_start = index + 1
+                try:
+                    record = apply_patch(record, ops)
+                except PatchError as e:
+                    errors.append((index, str(e)))
+                    continue
+                records.append(dumps(record, compact_output))
+                if path is not None:
+                    value = path.get(record, _MISSING_VALUE)
+                    if value is not _MISSING_VALUE:
+                        values.append(value)
+        except OSError as e:
+            return ([f"[ERROR] {e}"], [], start, True)
+        finally:
+            stream.close()
+
+        if done and errors:
+            # a trailing bad line still counts as consumed
+            next_start = max(next_start, errors[-1][0] + 1)
+        for index, message in errors[:10]:
+            print(f"[JsonlBatchProcessor] Record {index} skipped: {message}")
+        if len(errors) > 10:
+            print(f"[JsonlBatchProcessor] ... {len(errors) - 10} more records skipped")
+
+        return (records, values, next_start, done)
@@ -0,0 +1,291 @@
+"""
+Streaming helpers for the JSON nodes.
+
+iter_jsonl() reads JSONL / NDJSON input (a text or a file path) lazily, one
+record at a time, so a batch node only ever holds the chunk it emits.
+
+extract_lazy() pulls one path out of a JSON text without parsing all of it:
+it walks the keys on the way to the path, skips unrelated members, decodes
+only the value it was asked for and stops there. Skipped containers go
+through the C scanner of the json module (built and dropped at once), so the
+worst case - a field behind most of the document - costs about one full
+stdlib parse; fields near the start are found without reading the rest.
+
+Benchmark:
+    python json_stream.py benchmark [--size-mb 16] [--repeat 5]
+"""
+import argparse
+import io
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from json.decoder import scanstring
+
+if __package__:
+    from .json_backend import loads
+    from .json_path import _WILDCARD, _Index, compile_path
+else:
+    # executed as a script (python json_stream.py benchmark)
+    from json_backend import loads
+    from json_path import _WILDCARD, _Index, compile_path
+
+# (path, mtime_ns, size, record index) → byte offset where that record starts,
+# remembered at the end of every chunk so the next chunk does not rescan the file
+_RESUME_OFFSETS = OrderedDict()
+_RESUME_LOCK = threading.Lock()
+_RESUME_MAX = 256
+
+
+def is_jsonl_file(source):
+    source = source.strip()
+    return bool(source) and "\n" not in source and os.path.isfile(source)
+
+
+def jsonl_file_key(source):
+    """(absolute path, mtime_ns, size) of a JSONL file source; changes whenever the file does."""
+    path = os.path.abspath(source.strip())
+    st = os.stat(path)
+    return path, st.st_mtime_ns, st.st_size
+
+
+def _remember_offset(key, offset):
+    with _RESUME_LOCK:
+        _RESUME_OFFSETS[key] = offset
+        _RESUME_OFFSETS.move_to_end(key)
+        while len(_RESUME_OFFSETS) > _RESUME_MAX:
+            _RESUME_OFFSETS.popitem(last=False)
+
+
+def _resume_offset(key):
+    with _RESUME_LOCK:
+        return _RESUME_OFFSETS.get(key)
+
+
+def _iter_lines(source, start):
+    """
+    Yields (record index, file key, byte offset of the line, line) for every
+    non-blank line from record `start` on; file key and offset are None for text input.
+    """
+    if is_jsonl_file(source):
+        file_key = jsonl_file_key(source)
+        path = file_key[0]
+        offset = _resume_offset(file_key + (start,))
+        with open(path, "rb") as f:
+            index = 0
+            if offset is not None:
+                f.seek(offset)
+                index = start
+            while True:
+                line_offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                if index >= start:
+                    yield index, file_key, line_offset, line
+                index += 1
+    else:
+        text = source.strip()
+        if "\n" not in text and text.lower().endswith((".jsonl", ".ndjson", ".json")):
+            # one line named like a JSONL file that does not exist → a wrong path, not a record
+            raise FileNotFoundError(f"JSONL file not found: '{text}'")
+        index = 0
+        for line in io.StringIO(source):
+            if not line.strip():
+                continue
+            if index >= start:
+                yield index, None, None, line
+            index += 1
+
+
+def iter_jsonl(source, start=0, errors=None):
+    """
+    Lazily yields (record index, record) from JSONL text or a .jsonl file path,
+    beginning at record `start` (blank lines are not records). Lines that are
+    not valid JSON are skipped; their (index, message) is appended to `errors`.
+
+    When the generator is closed, the offset of the last record it read is
+    remembered, so a caller that stops after peeking at record N resumes
+    iter_jsonl(path, N) with a seek instead of rescanning the file.
+    """
+    resume = None
+    try:
+        for index, file_key, line_offset, line in _iter_lines(source, start):
+            if file_key is not None:
+                resume = (file_key + (index,), line_offset)
+            try:
+                record = loads(line)
+            except ValueError as e:
+                if errors is not None:
+                    errors.append((index, str(e)))
+                continue
+            yield index, record
+    finally:
+        if resume is not None:
+            _remember_offset(*resume)
+
+
+# --- lazy extraction ---
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+
+_SCALAR = re.compile(_STRING + r'|[^,\]}\s]+')
+_DECODER = json.JSONDecoder()
+
+
+def _error(message, text, pos):
+    return json.JSONDecodeError(message, text, pos)
+
+
+def _skip_ws(text, pos):
+    return _WHITESPACE.match(text, pos).end()
+
+
+def _skip_value(text, pos):
+    """Position right after the value starting at pos."""
+    if pos >= len(text):
+        raise _error("Expecting value", text, pos)
+    if text[pos] in "[{":
+        # one C-level call; a bracket counting loop in Python is slower than decoding
+        return _DECODER.raw_decode(text, pos)[1]
+    match = _SCALAR.match(text, pos)
+    if match is None:
+        raise _error("Expecting value", text, pos)
+    return match.end()
+
+
+def _find_member(text, pos, key):
+    """pos is at '{'. Returns the position of the value of `key` or None."""
+    pos = _skip_ws(text, pos + 1)
+    if text.startswith("}", pos):
+        return None
+    while True:
+        if not text.startswith('"', pos):
+            raise _error("Expecting property name enclosed in double quotes", text, pos)
+        name, pos = scanstring(text, pos + 1)
+        pos = _skip_ws(text, pos)
+        if not text.startswith(":", pos):
+            raise _error("Expecting ':' delimiter", text, pos)
+        pos = _skip_ws(text, pos + 1)
+        if name == key:
+            return pos
+        pos = _skip_ws(text, _skip_value(text, pos))
+        if text.startswith(",", pos):
+            pos = _skip_ws(text, pos + 1)
+        elif text.startswith("}", pos):
+            return None
+        else:
+            raise _error("Expecting ',' delimiter", text, pos)
+
+
+def _find_item(text, pos, index):
+    """pos is at '['. Returns the position of item `index` (>= 0) or None."""
+    pos = _skip_ws(text, pos + 1)
+    if text.startswith("]", pos):
+        return None
+    current = 0
+    while True:
+        if current == index:
+            return pos
+        pos = _skip_ws(text, _skip_value(text, pos))
+        if text.startswith(",", pos):
+            pos = _skip_ws(text, pos + 1)
+            current += 1
+        elif text.startswith("]", pos):
+            return None
+        else:
+            raise _error("Expecting ',' delimiter", text, pos)
+
+
+def extract_lazy(text, path):
+    """
+    Value at `path` (dotted syntax of json_path) read straight from the JSON text.
+    Raises KeyError when the path does not exist and ValueError for malformed
+    JSON on the way to it; the rest of the text is not looked at.
+
+    Differences to compile_path(path).get(json.loads(text)):
+      - duplicate keys: the first occurrence wins (json.loads keeps the last one)
+      - wildcards and negative indices need the whole document, so these
+        paths fall back to a full parse
+    """
+    compiled = compile_path(path)
+    if any(s is _WILDCARD or (isinstance(s, _Index) and s.index < 0) for s in compiled.segments):
+        return compiled.get(loads(text))
+
+    pos = _skip_ws(text, 0)
+    for segment in compiled.segments:
+        opener = text[pos:pos + 1]
+        if opener == "{":
+            key = segment.key if isinstance(segment, _Index) else segment.name
+            pos = _find_member(text, pos, key)
+        elif opener == "[" and isinstance(segment, _Index):
+            pos = _find_item(text, pos, segment.index)
+        else:
+            pos = None
+        if pos is None:
+            raise KeyError(compiled.path)
+
+    value, _ = _DECODER.raw_decode(text, pos)
+    return value
+
+
+# --- benchmark ---
+
+def _sample_document(size_mb):
+    record = {
+        "name": "Harley",
+        "info": {"city": "Gotham", "zip": "10001", "coords": [40.7128, -74.006]},
+        "tags": ["psycho", "funny", "dangerous"],
+        "description": "cinematic portrait, {dramatic} lighting, [35mm] \"film\", " * 3,
+        "scores": [1, 2.5, 3, 4],
+    }
+    record_size = len(json.dumps(record))
+    count = max(1, int(size_mb * 1024 * 1024 / record_size))
+    return {
+        "version": 3,
+        "settings": {"seed": 42, "sampler": "euler"},
+        "items": [dict(record, id=i) for i in range(count)],
+        "footer": {"author": "stalkervr"},
+    }
+
+
+def benchmark(size_mb=16, repeat=5):
+    text = json.dumps(_sample_document(size_mb))
+    mb = len(text) / (1024 * 1024)
+    paths = ["settings.seed", "items.0.info.city", "items.5000.name", "footer.author"]
+    print(f"[JsonStream] document {mb:.1f} MB, best of {repeat}")
+    results = {}
+    for path in paths:
+        full = lazy = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            expected = compile_path(path).get(loads(text))
+            full = min(full, time.perf_counter() - started)
+            started = time.perf_counter()
+            value = extract_lazy(text, path)
+            lazy = min(lazy, time.perf_counter() - started)
+            assert value == expected, (path, value, expected)
+        results[path] = (full, lazy)
+        print(f"  {path:<20} full parse {full * 1000:8.2f} ms   lazy {lazy * 1000:8.2f} ms   x{full / lazy:.1f}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="JSON streaming tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("benchmark", help="compare lazy extraction with a full parse")
+    bench.add_argument("--size-mb", type=float, default=16)
+    bench.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == "benchmark":
+        benchmark(args.size_mb, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ import os
 from aiohttp import web
 from server import PromptServer
 
+from .json_backend import dumps as json_dumps
+
 class SavePath:
     """
     A node that builds various folder paths and file names for a given character model,
@@ -138,7 +140,7 @@ async def _concat_api(request):
     inputs = node.INPUT_TYPES()["required"]
     values = [params.get(k) or cfg.get("default") for k, (_, cfg) in inputs.items()]
     result = node.concat(*values)
-    return web.json_response(dict(zip(node.RETURN_NAMES, result)))
+    return web.json_response(dict(zip(node.RETURN_NAMES, result)), dumps=json_dumps)
 
 class PathPipeReroute:
     """
@@ -269,4 +271,7 @@ class PathPipeIn:
             grid_model_file_crop_name or orig[8],
             dataset_file_name or orig[9],
         ]
+        # nothing overridden → pass the input object through, so downstream sees the same value
+        if isinstance(path_pipe, list) and out == path_pipe:
+            return (path_pipe,)
         return (out,)
@@ -64,25 +64,70 @@ import { app } from "../../../scripts/app.js";
 
 const NODE_NAME = "DataFileLoader";
 
+// source -> { etag, names }; revalidated with If-None-Match so unchanged sources cost a 304
+const namesCache = new Map();
+
 async function fetchNamesForSource(source) {
   const body = new FormData();
   body.append("source", source);
 
+  const cached = namesCache.get(source);
+  const headers = {};
+  if (cached?.etag) {
+    headers["If-None-Match"] = cached.etag;
+  }
+
   try {
     const response = await fetch("/datafile/names_for_source", {
       method: "POST",
       body: body,
+      headers: headers,
     });
 
+    if (response.status === 304 && cached) {
+      return cached.names;
+    }
+
     const data = await response.json();
-    console.log(`[${NODE_NAME}] Received names for source '${source}':`, data.names);
+    const etag = response.headers.get("ETag");
+    if (etag) {
+      namesCache.set(source, { etag, names: data.names });
+    }
+    console.log(`[${NODE_NAME}] Received ${data.names.length} names for source '${source}'`);
     return data.names;
   } catch (error) {
     console.error(`[${NODE_NAME}] Error fetching names:`, error);
-    return [];
+    return cached?.names ?? [];
   }
 }
 
+// Pushed by the server-side data directory watcher only when sources really changed
+api.addEventListener("datafile.sources_changed", async ({ detail }) => {
+  const changed = new Set(detail?.changed ?? []);
+  changed.forEach((source) => namesCache.delete(source));
+
+  for (const node of app.graph?._nodes ?? []) {
+    if (node.type !== NODE_NAME) continue;
+
+    const sourceWidget = node.widgets?.find((w) => w.name === "source");
+    const nameWidget = node.widgets?.find((w) => w.name === "name");
+    if (!sourceWidget || !nameWidget) continue;
+
+    if (Array.isArray(detail?.sources)) {
+      sourceWidget.options.values = detail.sources;
+    }
+
+    if (changed.has(sourceWidget.value)) {
+      const names = await fetchNamesForSource(sourceWidget.value);
+      nameWidget.options.values = names;
+      if (!names.includes(nameWidget.value)) {
+        nameWidget.value = names[0] || "";
+      }
+    }
+    node.setDirtyCanvas(true, true);
+  }
+});
+
 app.registerExtension({
   name: `custom.${NODE_NAME}`,
 